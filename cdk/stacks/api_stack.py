@@ -7,6 +7,7 @@ from aws_cdk import (
     aws_lambda as lambda_,
     aws_apigateway as apigateway,
     aws_cognito as cognito,
+    aws_ssm as ssm,
 )
 from constructs import Construct
 
@@ -221,3 +222,11 @@ class ApiStack(Stack):
             authorizer=authorizer,
             authorization_type=apigateway.AuthorizationType.COGNITO,
         )
+
+        # Publish the API ID for operational scripts
+        ssm.StringParameter(
+            self,
+            "ApiIdParameter",
+            parameter_name="/carbonready/api/id",
+            string_value=self.api.rest_api_id,
+        )
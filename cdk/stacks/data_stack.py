@@ -7,6 +7,7 @@ from aws_cdk import (
     Duration,
     aws_dynamodb as dynamodb,
     aws_s3 as s3,
+    aws_ssm as ssm,
 )
 from constructs import Construct
 
@@ -341,3 +342,26 @@ class DataStack(Stack):
             ],
         )
 
+        # Publish physical table names for operational scripts
+        self._publish_table_names()
+
+    def _publish_table_names(self) -> None:
+        """Publish table names as SSM parameters under /carbonready/tables/"""
+        tables = {
+            "SensorDataTable": self.sensor_data_table,
+            "FarmMetadataTable": self.farm_metadata_table,
+            "CarbonCalculationsTable": self.carbon_calculations_table,
+            "AIModelRegistryTable": self.ai_model_registry_table,
+            "SensorCalibrationTable": self.sensor_calibration_table,
+            "CRIWeightsTable": self.cri_weights_table,
+            "GrowthCurvesTable": self.growth_curves_table,
+        }
+
+        for logical_name, table in tables.items():
+            ssm.StringParameter(
+                self,
+                f"{logical_name}NameParameter",
+                parameter_name=f"/carbonready/tables/{logical_name}",
+                string_value=table.table_name,
+            )
+
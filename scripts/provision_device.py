@@ -11,20 +11,49 @@ This script provisions ESP32 devices for the CarbonReady system by:
 Requirements: 11.1, 11.3, 18.1
 """
 import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.config import Config
+from botocore.exceptions import ClientError
+import functools
 import json
+import logging
 import os
+import queue
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 import argparse
 
+# Shared client config: provision_batch fans device provisioning out over
+# threads, so size the connection pool for them and back off adaptively
+# under throttling. tcp_keepalive only enables SO_KEEPALIVE probes on idle
+# sockets; connection reuse comes from the pool either way.
+BOTO_CONFIG = Config(
+    max_pool_connections=32,
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+log = logging.getLogger('carbonready')
+
 # AWS clients
-iot = boto3.client('iot')
-dynamodb = boto3.resource('dynamodb')
+iot = boto3.client('iot', config=BOTO_CONFIG)
+dynamodb = boto3.resource('dynamodb', config=BOTO_CONFIG)
 
+CALIBRATION_TABLE_PARAMETER = '/carbonready/tables/SensorCalibrationTable'
+
+@functools.lru_cache(maxsize=None)
 def get_calibration_table():
-    """Find the sensor calibration table"""
-    client = boto3.client('dynamodb')
+    """Find the sensor calibration table (looked up once per run)"""
+    ssm = boto3.client('ssm', config=BOTO_CONFIG)
+    try:
+        return ssm.get_parameter(Name=CALIBRATION_TABLE_PARAMETER)['Parameter']['Value']
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ParameterNotFound':
+            raise
+    
+    client = boto3.client('dynamodb', config=BOTO_CONFIG)
     tables = client.list_tables()['TableNames']
     matching = [t for t in tables if 'SensorCalibrationTable' in t]
     if matching:
@@ -36,7 +65,8 @@ def create_device_certificates(device_id):
     Generate unique X.509 certificates for device
     Returns: certificate ARN, certificate ID, certificate PEM, key pair
     """
-    print(f"\nGenerating X.509 certificates for {device_id}...")
+    log.info("")
+    log.info("Generating X.509 certificates for %s...", device_id)
     
     # Create keys and certificate
     response = iot.create_keys_and_certificate(setAsActive=True)
@@ -49,69 +79,69 @@ def create_device_certificates(device_id):
         'private': response['keyPair']['PrivateKey']
     }
     
-    print(f"[OK] Certificate created: {certificate_id}")
-    print(f"  ARN: {certificate_arn}")
+    log.info("[OK] Certificate created: %s", certificate_id)
+    log.info("  ARN: %s", certificate_arn)
     
     return certificate_arn, certificate_id, certificate_pem, key_pair
 
-def create_iot_thing(device_id, farm_id, certificate_arn):
+def create_iot_thing(device_id, farm_id, certificate_arn, provisioned_at):
     """
     Create IoT Thing and attach certificate and policy
     """
-    print(f"\nCreating IoT Thing: {device_id}...")
+    log.info("")
+    log.info("Creating IoT Thing: %s...", device_id)
     
     # Create Thing with farm_id attribute
+    attribute_payload = {
+        'attributes': {
+            'farmId': farm_id,
+            'deviceType': 'ESP32-WROOM-32',
+            'provisionedAt': provisioned_at.isoformat()
+        }
+    }
     try:
         iot.create_thing(
             thingName=device_id,
-            attributePayload={
-                'attributes': {
-                    'farmId': farm_id,
-                    'deviceType': 'ESP32-WROOM-32',
-                    'provisionedAt': datetime.now(timezone.utc).isoformat()
-                }
-            }
+            attributePayload=attribute_payload
         )
-        print(f"[OK] Thing created: {device_id}")
+        log.info("[OK] Thing created: %s", device_id)
     except iot.exceptions.ResourceAlreadyExistsException:
-        print(f"[WARN] Thing {device_id} already exists, updating attributes...")
+        log.warning("[WARN] Thing %s already exists, updating attributes...", device_id)
         iot.update_thing(
             thingName=device_id,
-            attributePayload={
-                'attributes': {
-                    'farmId': farm_id,
-                    'deviceType': 'ESP32-WROOM-32',
-                    'provisionedAt': datetime.now(timezone.utc).isoformat()
-                }
-            }
+            attributePayload=attribute_payload
         )
     
     # Attach certificate to Thing
-    print(f"Attaching certificate to Thing...")
+    log.info("Attaching certificate to Thing...")
     iot.attach_thing_principal(
         thingName=device_id,
         principal=certificate_arn
     )
-    print(f"[OK] Certificate attached to Thing")
+    log.info("[OK] Certificate attached to Thing")
     
     # Attach policy to certificate
     policy_name = "CarbonReadyESP32SensorPolicy"
-    print(f"Attaching policy {policy_name}...")
+    log.info("Attaching policy %s...", policy_name)
     try:
         iot.attach_policy(
             policyName=policy_name,
             target=certificate_arn
         )
-        print(f"[OK] Policy attached to certificate")
+        log.info("[OK] Policy attached to certificate")
     except Exception as e:
-        print(f"[WARN] Warning: Could not attach policy: {e}")
-        print(f"  Make sure the IoT stack is deployed")
+        log.warning("[WARN] Warning: Could not attach policy: %s", e)
+        log.info("  Make sure the IoT stack is deployed")
 
 def save_certificates(device_id, certificate_pem, key_pair, output_dir):
     """
     Save certificates to local directory for SPIFFS upload
+    
+    PEM files are always written with LF line endings, which the ESP32
+    TLS stack expects regardless of the host platform.
     """
-    print(f"\nSaving certificates to {output_dir}...")
+    log.info("")
+    log.info("Saving certificates to %s...", output_dir)
     
     # Create device-specific directory
     device_dir = Path(output_dir) / device_id
@@ -119,38 +149,36 @@ def save_certificates(device_id, certificate_pem, key_pair, output_dir):
     
     # Save certificate
     cert_file = device_dir / "device.crt"
-    with open(cert_file, 'w') as f:
-        f.write(certificate_pem)
-    print(f"[OK] Certificate saved: {cert_file}")
+    cert_file.write_text(certificate_pem, newline='\n')
+    log.info("[OK] Certificate saved: %s", cert_file)
     
     # Save private key
     key_file = device_dir / "device.key"
-    with open(key_file, 'w') as f:
-        f.write(key_pair['private'])
-    print(f"[OK] Private key saved: {key_file}")
+    key_file.write_text(key_pair['private'], newline='\n')
+    log.info("[OK] Private key saved: %s", key_file)
     
     # Save public key (for reference)
     pub_key_file = device_dir / "device.pub"
-    with open(pub_key_file, 'w') as f:
-        f.write(key_pair['public'])
-    print(f"[OK] Public key saved: {pub_key_file}")
+    pub_key_file.write_text(key_pair['public'], newline='\n')
+    log.info("[OK] Public key saved: %s", pub_key_file)
     
     # Download Amazon Root CA (if not already present)
     root_ca_file = device_dir / "AmazonRootCA1.pem"
     if not root_ca_file.exists():
-        print(f"Downloading Amazon Root CA...")
+        log.info("Downloading Amazon Root CA...")
         import urllib.request
         root_ca_url = "https://www.amazontrust.com/repository/AmazonRootCA1.pem"
         urllib.request.urlretrieve(root_ca_url, root_ca_file)
-        print(f"[OK] Root CA saved: {root_ca_file}")
+        log.info("[OK] Root CA saved: %s", root_ca_file)
     
     return device_dir
 
-def create_device_config(device_id, farm_id, output_dir):
+def create_device_config(device_id, farm_id, output_dir, provisioned_at):
     """
     Create device configuration file for firmware
     """
-    print(f"\nCreating device configuration...")
+    log.info("")
+    log.info("Creating device configuration...")
     
     # Get IoT endpoint
     endpoint_response = iot.describe_endpoint(endpointType='iot:Data-ATS')
@@ -164,98 +192,205 @@ def create_device_config(device_id, farm_id, output_dir):
         "farmId": farm_id,
         "iotEndpoint": iot_endpoint,
         "mqttPort": 8883,
-        "provisionedAt": datetime.now(timezone.utc).isoformat()
+        "provisionedAt": provisioned_at.isoformat()
     }
     
     config_file = device_dir / "device_config.json"
     with open(config_file, 'w') as f:
         json.dump(config, f, indent=2)
-    print(f"[OK] Configuration saved: {config_file}")
-    print(f"  IoT Endpoint: {iot_endpoint}")
+    log.info("[OK] Configuration saved: %s", config_file)
+    log.info("  IoT Endpoint: %s", iot_endpoint)
     
     return config
 
-def log_calibration_requirement(device_id, farm_id):
+def build_calibration_record(device_id, farm_id, provisioned_at):
+    """
+    Build the pending calibration record for a newly provisioned device
+    """
+    return {
+        'deviceId': device_id,
+        'calibrationDate': provisioned_at.isoformat(),
+        'calibrationType': 'pending_initial',
+        'farmId': farm_id,
+        'calibrationParameters': {},
+        'referenceValues': {},
+        'performedBy': 'provisioning_script',
+        'nextCalibrationDue': (provisioned_at + timedelta(days=365)).isoformat(),
+        'status': 'PENDING'
+    }
+
+def calibration_record_exists(table_name, device_id):
+    """
+    Check whether the device already has a calibration record
+    
+    Queries through the resource's client, which unlike resource objects is
+    safe to share between provisioning threads.
+    """
+    response = dynamodb.meta.client.query(
+        TableName=table_name,
+        KeyConditionExpression=Key('deviceId').eq(device_id),
+        ProjectionExpression='deviceId',
+        Limit=1
+    )
+    return bool(response['Items'])
+
+def log_calibration_requirement(device_id, farm_id, provisioned_at):
     """
     Log that device requires initial calibration
     Requirement 18.1: Require sensor calibration confirmation before accepting data
     """
-    print(f"\nLogging calibration requirement...")
+    log.info("")
+    log.info("Logging calibration requirement...")
     
     try:
         table_name = get_calibration_table()
         table = dynamodb.Table(table_name)
         
+        # Re-provisioning keeps the existing calibration history
+        if calibration_record_exists(table_name, device_id):
+            log.info("[OK] Device %s already has a calibration record, skipping", device_id)
+            return
+        
         # Create a pending calibration record
-        calibration_record = {
-            'deviceId': device_id,
-            'calibrationDate': datetime.now(timezone.utc).isoformat(),
-            'calibrationType': 'pending_initial',
-            'farmId': farm_id,
-            'calibrationParameters': {},
-            'referenceValues': {},
-            'performedBy': 'provisioning_script',
-            'nextCalibrationDue': (datetime.now(timezone.utc) + timedelta(days=365)).isoformat(),
-            'status': 'PENDING'
-        }
+        calibration_record = build_calibration_record(device_id, farm_id, provisioned_at)
         
         table.put_item(Item=calibration_record)
-        print(f"[OK] Calibration requirement logged")
-        print(f"  [IMPORTANT] Device requires initial calibration before use")
-        print(f"  Run: python scripts/calibrate_device.py {device_id}")
+        log.info("[OK] Calibration requirement logged")
+        log.info("  [IMPORTANT] Device requires initial calibration before use")
+        log.info("  Run: python scripts/calibrate_device.py %s", device_id)
+        
+    except Exception as e:
+        log.warning("[WARN] Warning: Could not log calibration requirement: %s", e)
+
+def log_calibration_requirements(calibration_records):
+    """
+    Log calibration requirements for a batch of devices
+    
+    Uses batch_writer, which groups puts into BatchWriteItem calls of up
+    to 25 items and retries unprocessed items. batch_writer cannot carry
+    conditions, so the records must already exclude devices that have a
+    calibration record (see queue_calibration_record).
+    """
+    log.info("")
+    log.info("Logging calibration requirements for %s device(s)...", len(calibration_records))
+    
+    try:
+        table_name = get_calibration_table()
+        table = dynamodb.Table(table_name)
+        
+        with table.batch_writer() as batch:
+            for calibration_record in calibration_records:
+                batch.put_item(Item=calibration_record)
+        
+        log.info("[OK] Calibration requirements logged")
+        log.info("  [IMPORTANT] Devices require initial calibration before use")
         
     except Exception as e:
-        print(f"[WARN] Warning: Could not log calibration requirement: {e}")
+        log.warning("[WARN] Warning: Could not log calibration requirements: %s", e)
 
-def provision_device(device_id, farm_id, output_dir="device_certs"):
+def queue_calibration_record(calibration_queue, device_id, farm_id, provisioned_at):
+    """
+    Queue the pending calibration record for the batch write
+    
+    Runs in the provisioning worker, so each device's existence check
+    overlaps with the other devices' calls instead of running one after
+    another before the write.
+    """
+    try:
+        if calibration_record_exists(get_calibration_table(), device_id):
+            log.info("[OK] Device %s already has a calibration record, skipping", device_id)
+            return
+    except Exception as e:
+        log.warning("[WARN] Warning: Could not check calibration record for %s: %s", device_id, e)
+        return
+    
+    calibration_queue.put(build_calibration_record(device_id, farm_id, provisioned_at))
+
+def provision_device(device_id, farm_id, output_dir="device_certs", calibration_queue=None):
     """
     Complete device provisioning workflow
+    
+    When calibration_queue is given, the pending calibration record is put
+    on the queue instead of being written, so the caller can batch it.
     """
-    print("=" * 70)
-    print("CarbonReady ESP32 Device Provisioning")
-    print("=" * 70)
-    print(f"Device ID: {device_id}")
-    print(f"Farm ID: {farm_id}")
-    print(f"Output Directory: {output_dir}")
+    log.info("=" * 70)
+    log.info("CarbonReady ESP32 Device Provisioning")
+    log.info("=" * 70)
+    log.info("Device ID: %s", device_id)
+    log.info("Farm ID: %s", farm_id)
+    log.info("Output Directory: %s", output_dir)
+    
+    # One timestamp for the Thing attributes, device config and calibration record
+    provisioned_at = datetime.now(timezone.utc)
     
     try:
         # Step 1: Generate certificates
         cert_arn, cert_id, cert_pem, key_pair = create_device_certificates(device_id)
         
         # Step 2: Create IoT Thing and attach certificate
-        create_iot_thing(device_id, farm_id, cert_arn)
+        create_iot_thing(device_id, farm_id, cert_arn, provisioned_at)
         
         # Step 3: Save certificates locally
         device_dir = save_certificates(device_id, cert_pem, key_pair, output_dir)
         
         # Step 4: Create device configuration
-        config = create_device_config(device_id, farm_id, output_dir)
+        config = create_device_config(device_id, farm_id, output_dir, provisioned_at)
         
         # Step 5: Log calibration requirement
-        log_calibration_requirement(device_id, farm_id)
+        if calibration_queue is not None:
+            queue_calibration_record(calibration_queue, device_id, farm_id, provisioned_at)
+        else:
+            log_calibration_requirement(device_id, farm_id, provisioned_at)
         
         # Success summary
-        print("\n" + "=" * 70)
-        print("[SUCCESS] Device provisioning completed successfully!")
-        print("=" * 70)
-        print(f"\nCertificates and configuration saved to: {device_dir}")
-        print(f"\nNext steps:")
-        print(f"  1. Flash firmware to ESP32 device")
-        print(f"     python scripts/flash_firmware.py {device_id}")
-        print(f"  2. Upload certificates to SPIFFS partition")
-        print(f"     python scripts/upload_certificates.py {device_id}")
-        print(f"  3. Perform initial sensor calibration")
-        print(f"     python scripts/calibrate_device.py {device_id}")
-        print(f"  4. Deploy device to farm location")
+        log.info("")
+        log.info("=" * 70)
+        log.info("[SUCCESS] Device provisioning completed successfully!")
+        log.info("=" * 70)
+        log.info("")
+        log.info("Certificates and configuration saved to: %s", device_dir)
+        log.info("")
+        log.info("Next steps:")
+        log.info("  1. Flash firmware to ESP32 device")
+        log.info("     python scripts/flash_firmware.py %s", device_id)
+        log.info("  2. Upload certificates to SPIFFS partition")
+        log.info("     python scripts/upload_certificates.py %s", device_id)
+        log.info("  3. Perform initial sensor calibration")
+        log.info("     python scripts/calibrate_device.py %s", device_id)
+        log.info("  4. Deploy device to farm location")
         
         return True
         
     except Exception as e:
-        print(f"\n[ERROR] Error during provisioning: {e}")
-        import traceback
-        traceback.print_exc()
+        log.error("")
+        log.exception("[ERROR] Error during provisioning: %s", e)
         return False
 
+def provision_batch(device_ids, farm_id, output_dir="device_certs", max_workers=8):
+    """
+    Provision several devices for a farm concurrently
+    
+    Calibration records are collected from the workers and written in a
+    single batch once all devices have been provisioned.
+    Returns: list of device IDs that failed to provision
+    """
+    calibration_queue = queue.Queue()
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            lambda device_id: provision_device(device_id, farm_id, output_dir, calibration_queue),
+            device_ids
+        ))
+    
+    calibration_records = []
+    while not calibration_queue.empty():
+        calibration_records.append(calibration_queue.get())
+    
+    if calibration_records:
+        log_calibration_requirements(calibration_records)
+    
+    return [device_id for device_id, success in zip(device_ids, results) if not success]
+
 def main():
     parser = argparse.ArgumentParser(
         description='Provision ESP32 device for CarbonReady system'
@@ -267,9 +402,53 @@ def main():
         default='device_certs',
         help='Output directory for certificates (default: device_certs)'
     )
+    parser.add_argument(
+        '--additional-devices',
+        nargs='+',
+        default=[],
+        metavar='DEVICE_ID',
+        help='Further device identifiers to provision for the same farm in one batch'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Number of devices provisioned concurrently in batch mode (default: 8)'
+    )
+    parser.add_argument(
+        '-q', '--quiet',
+        action='store_true',
+        help='Only report warnings and errors'
+    )
     
     args = parser.parse_args()
     
+    # Progress goes to stdout and warnings and errors (with tracebacks) to
+    # stderr, which is what onboard_farm.py reports when provisioning fails
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.addFilter(lambda record: record.levelno < logging.WARNING)
+    stderr_handler = logging.StreamHandler(sys.stderr)
+    stderr_handler.setLevel(logging.WARNING)
+    logging.basicConfig(
+        handlers=[stdout_handler, stderr_handler],
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format='%(asctime)s %(threadName)s %(message)s' if args.additional_devices else '%(message)s'
+    )
+    
+    if args.additional_devices:
+        # Blank spacer lines only make sense in single-device output; with
+        # interleaved, timestamped records they would be bare prefixes
+        for handler in logging.getLogger().handlers:
+            handler.addFilter(lambda record: record.getMessage() != '')
+        
+        device_ids = [args.device_id] + args.additional_devices
+        failed = provision_batch(device_ids, args.farm_id, args.output_dir, args.workers)
+        log.info("")
+        log.info("Provisioned %s/%s devices", len(device_ids) - len(failed), len(device_ids))
+        if failed:
+            log.error("[ERROR] Failed devices: %s", ', '.join(failed))
+        sys.exit(0 if not failed else 1)
+    
     success = provision_device(args.device_id, args.farm_id, args.output_dir)
     sys.exit(0 if success else 1)
 
@@ -4,16 +4,28 @@ Setup Production CloudWatch Alarms
 Creates comprehensive monitoring alarms for CarbonReady production environment
 """
 import boto3
+from botocore.config import Config
+import logging
 import sys
 import argparse
 from typing import List, Dict
 
+# Shared client config: alarms are created one after another in a burst of
+# put_metric_alarm calls, so back off adaptively if CloudWatch throttles the
+# burst. tcp_keepalive just turns on SO_KEEPALIVE for the client's sockets.
+BOTO_CONFIG = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+log = logging.getLogger('carbonready')
+
 # Initialize AWS clients
-cloudwatch = boto3.client('cloudwatch')
-lambda_client = boto3.client('lambda')
-dynamodb = boto3.client('dynamodb')
-apigateway = boto3.client('apigateway')
-sns = boto3.client('sns')
+cloudwatch = boto3.client('cloudwatch', config=BOTO_CONFIG)
+lambda_client = boto3.client('lambda', config=BOTO_CONFIG)
+dynamodb = boto3.client('dynamodb', config=BOTO_CONFIG)
+apigateway = boto3.client('apigateway', config=BOTO_CONFIG)
+sns = boto3.client('sns', config=BOTO_CONFIG)
 
 
 def get_sns_topic_arn(topic_name: str) -> str:
@@ -25,12 +37,45 @@ def get_sns_topic_arn(topic_name: str) -> str:
                 return topic['TopicArn']
         raise ValueError(f"SNS topic {topic_name} not found")
     except Exception as e:
-        print(f"Error finding SNS topic: {e}")
+        log.error("Error finding SNS topic: %s", e)
         sys.exit(1)
 
 
-def create_lambda_error_alarms(critical_topic_arn: str) -> None:
-    """Create alarms for Lambda function errors"""
+def metric_alarm(name: str, description: str, topic_arn: str, metric_name: str,
+                 namespace: str, statistic: str, threshold: float, comparison: str,
+                 evaluation_periods: int, dimensions: List[Dict] = None) -> Dict:
+    """Build put_metric_alarm arguments with the settings shared by every alarm"""
+    spec = {
+        'AlarmName': name,
+        'AlarmDescription': description,
+        'ActionsEnabled': True,
+        'AlarmActions': [topic_arn],
+        'MetricName': metric_name,
+        'Namespace': namespace,
+        'Statistic': statistic,
+        'Period': 300,  # 5 minutes
+        'EvaluationPeriods': evaluation_periods,
+        'Threshold': threshold,
+        'ComparisonOperator': comparison,
+        'TreatMissingData': 'notBreaching'
+    }
+    if dimensions:
+        spec['Dimensions'] = dimensions
+    return spec
+
+
+def get_lambda_timeouts() -> Dict[str, int]:
+    """Get the timeout of every Lambda function in one paginated pass"""
+    paginator = lambda_client.get_paginator('list_functions')
+    return {
+        function['FunctionName']: function['Timeout']
+        for page in paginator.paginate()
+        for function in page['Functions']
+    }
+
+
+def lambda_alarm_specs(critical_topic_arn: str) -> List[Dict]:
+    """Build alarm specs for Lambda function errors, throttles and duration"""
     lambda_functions = [
         'carbonready-data-ingestion',
         'carbonready-ai-processing',
@@ -38,79 +83,48 @@ def create_lambda_error_alarms(critical_topic_arn: str) -> None:
         'carbonready-farm-metadata-api'
     ]
     
+    try:
+        timeouts = get_lambda_timeouts()
+    except Exception as e:
+        log.warning("⚠ Could not list Lambda functions: %s", e)
+        timeouts = {}
+    
+    specs = []
     for function_name in lambda_functions:
+        dimensions = [{'Name': 'FunctionName', 'Value': function_name}]
+        
         # Error rate alarm (> 5%)
-        cloudwatch.put_metric_alarm(
-            AlarmName=f'{function_name}-error-rate',
-            AlarmDescription=f'Error rate > 5% for {function_name}',
-            ActionsEnabled=True,
-            AlarmActions=[critical_topic_arn],
-            MetricName='Errors',
-            Namespace='AWS/Lambda',
-            Statistic='Sum',
-            Dimensions=[
-                {'Name': 'FunctionName', 'Value': function_name}
-            ],
-            Period=300,  # 5 minutes
-            EvaluationPeriods=2,
-            Threshold=5.0,
-            ComparisonOperator='GreaterThanThreshold',
-            TreatMissingData='notBreaching'
-        )
-        print(f"✓ Created error rate alarm for {function_name}")
+        specs.append(metric_alarm(
+            f'{function_name}-error-rate', f'Error rate > 5% for {function_name}',
+            critical_topic_arn, 'Errors', 'AWS/Lambda', 'Sum',
+            5.0, 'GreaterThanThreshold', 2, dimensions
+        ))
         
         # Throttle alarm
-        cloudwatch.put_metric_alarm(
-            AlarmName=f'{function_name}-throttles',
-            AlarmDescription=f'Throttling detected for {function_name}',
-            ActionsEnabled=True,
-            AlarmActions=[critical_topic_arn],
-            MetricName='Throttles',
-            Namespace='AWS/Lambda',
-            Statistic='Sum',
-            Dimensions=[
-                {'Name': 'FunctionName', 'Value': function_name}
-            ],
-            Period=300,
-            EvaluationPeriods=1,
-            Threshold=1.0,
-            ComparisonOperator='GreaterThanOrEqualToThreshold',
-            TreatMissingData='notBreaching'
-        )
-        print(f"✓ Created throttle alarm for {function_name}")
+        specs.append(metric_alarm(
+            f'{function_name}-throttles', f'Throttling detected for {function_name}',
+            critical_topic_arn, 'Throttles', 'AWS/Lambda', 'Sum',
+            1.0, 'GreaterThanOrEqualToThreshold', 1, dimensions
+        ))
         
         # Duration alarm (> 80% of timeout)
-        try:
-            response = lambda_client.get_function_configuration(
-                FunctionName=function_name
-            )
-            timeout = response['Timeout']
-            threshold = timeout * 0.8 * 1000  # Convert to milliseconds
-            
-            cloudwatch.put_metric_alarm(
-                AlarmName=f'{function_name}-high-duration',
-                AlarmDescription=f'Duration > 80% of timeout for {function_name}',
-                ActionsEnabled=True,
-                AlarmActions=[critical_topic_arn],
-                MetricName='Duration',
-                Namespace='AWS/Lambda',
-                Statistic='Average',
-                Dimensions=[
-                    {'Name': 'FunctionName', 'Value': function_name}
-                ],
-                Period=300,
-                EvaluationPeriods=2,
-                Threshold=threshold,
-                ComparisonOperator='GreaterThanThreshold',
-                TreatMissingData='notBreaching'
-            )
-            print(f"✓ Created duration alarm for {function_name}")
-        except Exception as e:
-            print(f"⚠ Could not create duration alarm for {function_name}: {e}")
+        timeout = timeouts.get(function_name)
+        if timeout is None:
+            log.warning("⚠ Could not create duration alarm for %s: function not found", function_name)
+            continue
+        threshold = timeout * 0.8 * 1000  # Convert to milliseconds
+        
+        specs.append(metric_alarm(
+            f'{function_name}-high-duration', f'Duration > 80% of timeout for {function_name}',
+            critical_topic_arn, 'Duration', 'AWS/Lambda', 'Average',
+            threshold, 'GreaterThanThreshold', 2, dimensions
+        ))
+    
+    return specs
 
 
-def create_dynamodb_alarms(critical_topic_arn: str, warnings_topic_arn: str) -> None:
-    """Create alarms for DynamoDB tables"""
+def dynamodb_alarm_specs(warnings_topic_arn: str) -> List[Dict]:
+    """Build alarm specs for DynamoDB read and write throttling"""
     tables = [
         'SensorDataTable',
         'FarmMetadataTable',
@@ -121,162 +135,98 @@ def create_dynamodb_alarms(critical_topic_arn: str, warnings_topic_arn: str) ->
         'GrowthCurvesTable'
     ]
     
+    try:
+        all_tables = dynamodb.list_tables()['TableNames']
+    except Exception as e:
+        log.warning("⚠ Error listing DynamoDB tables: %s", e)
+        return []
+    
+    specs = []
     for table_name in tables:
         # Find full table name (includes stack prefix)
-        try:
-            response = dynamodb.list_tables()
-            full_table_name = None
-            for name in response['TableNames']:
-                if table_name in name:
-                    full_table_name = name
-                    break
-            
-            if not full_table_name:
-                print(f"⚠ Table {table_name} not found, skipping")
-                continue
-            
-            # Read throttle alarm
-            cloudwatch.put_metric_alarm(
-                AlarmName=f'{table_name}-read-throttles',
-                AlarmDescription=f'Read throttling detected for {table_name}',
-                ActionsEnabled=True,
-                AlarmActions=[warnings_topic_arn],
-                MetricName='ReadThrottleEvents',
-                Namespace='AWS/DynamoDB',
-                Statistic='Sum',
-                Dimensions=[
-                    {'Name': 'TableName', 'Value': full_table_name}
-                ],
-                Period=300,
-                EvaluationPeriods=1,
-                Threshold=5.0,
-                ComparisonOperator='GreaterThanThreshold',
-                TreatMissingData='notBreaching'
-            )
-            print(f"✓ Created read throttle alarm for {table_name}")
-            
-            # Write throttle alarm
-            cloudwatch.put_metric_alarm(
-                AlarmName=f'{table_name}-write-throttles',
-                AlarmDescription=f'Write throttling detected for {table_name}',
-                ActionsEnabled=True,
-                AlarmActions=[warnings_topic_arn],
-                MetricName='WriteThrottleEvents',
-                Namespace='AWS/DynamoDB',
-                Statistic='Sum',
-                Dimensions=[
-                    {'Name': 'TableName', 'Value': full_table_name}
-                ],
-                Period=300,
-                EvaluationPeriods=1,
-                Threshold=5.0,
-                ComparisonOperator='GreaterThanThreshold',
-                TreatMissingData='notBreaching'
-            )
-            print(f"✓ Created write throttle alarm for {table_name}")
-            
-        except Exception as e:
-            print(f"⚠ Error creating alarms for {table_name}: {e}")
-
-
-def create_api_gateway_alarms(critical_topic_arn: str) -> None:
-    """Create alarms for API Gateway"""
-    try:
-        # Find API Gateway by name
-        response = apigateway.get_rest_apis()
-        api_id = None
-        for api in response['items']:
-            if 'CarbonReady' in api['name']:
-                api_id = api['id']
-                break
+        full_table_name = next((name for name in all_tables if table_name in name), None)
+        if not full_table_name:
+            log.warning("⚠ Table %s not found, skipping", table_name)
+            continue
         
-        if not api_id:
-            print("⚠ API Gateway not found, skipping API alarms")
-            return
+        dimensions = [{'Name': 'TableName', 'Value': full_table_name}]
         
-        # 5xx error rate alarm
-        cloudwatch.put_metric_alarm(
-            AlarmName='api-gateway-5xx-errors',
-            AlarmDescription='API Gateway 5xx error rate > 1%',
-            ActionsEnabled=True,
-            AlarmActions=[critical_topic_arn],
-            MetricName='5XXError',
-            Namespace='AWS/ApiGateway',
-            Statistic='Sum',
-            Dimensions=[
-                {'Name': 'ApiName', 'Value': 'CarbonReady API'}
-            ],
-            Period=300,
-            EvaluationPeriods=2,
-            Threshold=10.0,  # 10 errors in 5 minutes
-            ComparisonOperator='GreaterThanThreshold',
-            TreatMissingData='notBreaching'
-        )
-        print("✓ Created API Gateway 5xx error alarm")
-        
-        # High latency alarm
-        cloudwatch.put_metric_alarm(
-            AlarmName='api-gateway-high-latency',
-            AlarmDescription='API Gateway latency > 3 seconds',
-            ActionsEnabled=True,
-            AlarmActions=[critical_topic_arn],
-            MetricName='Latency',
-            Namespace='AWS/ApiGateway',
-            Statistic='Average',
-            Dimensions=[
-                {'Name': 'ApiName', 'Value': 'CarbonReady API'}
-            ],
-            Period=300,
-            EvaluationPeriods=2,
-            Threshold=3000.0,  # 3 seconds in milliseconds
-            ComparisonOperator='GreaterThanThreshold',
-            TreatMissingData='notBreaching'
-        )
-        print("✓ Created API Gateway latency alarm")
+        # Read throttle alarm
+        specs.append(metric_alarm(
+            f'{table_name}-read-throttles', f'Read throttling detected for {table_name}',
+            warnings_topic_arn, 'ReadThrottleEvents', 'AWS/DynamoDB', 'Sum',
+            5.0, 'GreaterThanThreshold', 1, dimensions
+        ))
         
-    except Exception as e:
-        print(f"⚠ Error creating API Gateway alarms: {e}")
+        # Write throttle alarm
+        specs.append(metric_alarm(
+            f'{table_name}-write-throttles', f'Write throttling detected for {table_name}',
+            warnings_topic_arn, 'WriteThrottleEvents', 'AWS/DynamoDB', 'Sum',
+            5.0, 'GreaterThanThreshold', 1, dimensions
+        ))
+    
+    return specs
 
 
-def create_iot_alarms(warnings_topic_arn: str) -> None:
-    """Create alarms for IoT Core"""
+def api_gateway_alarm_specs(critical_topic_arn: str) -> List[Dict]:
+    """Build alarm specs for API Gateway errors and latency"""
     try:
-        # Connection failure alarm
-        cloudwatch.put_metric_alarm(
-            AlarmName='iot-connection-failures',
-            AlarmDescription='IoT Core connection failures detected',
-            ActionsEnabled=True,
-            AlarmActions=[warnings_topic_arn],
-            MetricName='Connect.ClientError',
-            Namespace='AWS/IoT',
-            Statistic='Sum',
-            Period=300,
-            EvaluationPeriods=1,
-            Threshold=10.0,
-            ComparisonOperator='GreaterThanThreshold',
-            TreatMissingData='notBreaching'
-        )
-        print("✓ Created IoT connection failure alarm")
-        
-        # Message publish failure alarm
-        cloudwatch.put_metric_alarm(
-            AlarmName='iot-publish-failures',
-            AlarmDescription='IoT Core message publish failures detected',
-            ActionsEnabled=True,
-            AlarmActions=[warnings_topic_arn],
-            MetricName='PublishIn.ClientError',
-            Namespace='AWS/IoT',
-            Statistic='Sum',
-            Period=300,
-            EvaluationPeriods=1,
-            Threshold=10.0,
-            ComparisonOperator='GreaterThanThreshold',
-            TreatMissingData='notBreaching'
+        # Find API Gateway by name, stopping at the first match
+        paginator = apigateway.get_paginator('get_rest_apis')
+        api_id = next(
+            (api['id'] for page in paginator.paginate() for api in page['items']
+             if 'CarbonReady' in api['name']),
+            None
         )
-        print("✓ Created IoT publish failure alarm")
-        
     except Exception as e:
-        print(f"⚠ Error creating IoT alarms: {e}")
+        log.warning("⚠ Error finding API Gateway: %s", e)
+        return []
+    
+    if not api_id:
+        log.warning("⚠ API Gateway not found, skipping API alarms")
+        return []
+    
+    dimensions = [{'Name': 'ApiName', 'Value': 'CarbonReady API'}]
+    return [
+        # 5xx error rate alarm (10 errors in 5 minutes)
+        metric_alarm(
+            'api-gateway-5xx-errors', 'API Gateway 5xx error rate > 1%',
+            critical_topic_arn, '5XXError', 'AWS/ApiGateway', 'Sum',
+            10.0, 'GreaterThanThreshold', 2, dimensions
+        ),
+        # High latency alarm (3 seconds in milliseconds)
+        metric_alarm(
+            'api-gateway-high-latency', 'API Gateway latency > 3 seconds',
+            critical_topic_arn, 'Latency', 'AWS/ApiGateway', 'Average',
+            3000.0, 'GreaterThanThreshold', 2, dimensions
+        ),
+    ]
+
+
+def iot_alarm_specs(warnings_topic_arn: str) -> List[Dict]:
+    """Build alarm specs for IoT Core connection and publish failures"""
+    return [
+        metric_alarm(
+            'iot-connection-failures', 'IoT Core connection failures detected',
+            warnings_topic_arn, 'Connect.ClientError', 'AWS/IoT', 'Sum',
+            10.0, 'GreaterThanThreshold', 1
+        ),
+        metric_alarm(
+            'iot-publish-failures', 'IoT Core message publish failures detected',
+            warnings_topic_arn, 'PublishIn.ClientError', 'AWS/IoT', 'Sum',
+            10.0, 'GreaterThanThreshold', 1
+        ),
+    ]
+
+
+def put_metric_alarms(alarm_specs: List[Dict]) -> None:
+    """Create or update every alarm in the spec list (idempotent by name)"""
+    for spec in alarm_specs:
+        try:
+            cloudwatch.put_metric_alarm(**spec)
+            log.info("✓ Created alarm %s", spec['AlarmName'])
+        except Exception as e:
+            log.warning("⚠ Error creating alarm %s: %s", spec['AlarmName'], e)
 
 
 def create_composite_alarms(critical_topic_arn: str) -> None:
@@ -294,10 +244,10 @@ def create_composite_alarms(critical_topic_arn: str) -> None:
                 "ALARM(api-gateway-5xx-errors)"
             )
         )
-        print("✓ Created system health composite alarm")
+        log.info("✓ Created system health composite alarm")
         
     except Exception as e:
-        print(f"⚠ Error creating composite alarms: {e}")
+        log.warning("⚠ Error creating composite alarms: %s", e)
 
 
 def main():
@@ -309,56 +259,65 @@ def main():
         default='ap-south-1',
         help='AWS region (default: ap-south-1)'
     )
+    parser.add_argument(
+        '-q', '--quiet',
+        action='store_true',
+        help='Only report warnings and errors'
+    )
     args = parser.parse_args()
     
-    print("=" * 60)
-    print("CarbonReady Production Alarm Setup")
-    print("=" * 60)
-    print()
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format='%(message)s'
+    )
+    
+    log.info("=" * 60)
+    log.info("CarbonReady Production Alarm Setup")
+    log.info("=" * 60)
+    log.info("")
     
     # Get SNS topic ARNs
-    print("Finding SNS topics...")
+    log.info("Finding SNS topics...")
     try:
         critical_topic_arn = get_sns_topic_arn('carbonready-critical-alerts')
         warnings_topic_arn = get_sns_topic_arn('carbonready-warnings')
-        print(f"✓ Critical alerts topic: {critical_topic_arn}")
-        print(f"✓ Warnings topic: {warnings_topic_arn}")
-        print()
+        log.info("✓ Critical alerts topic: %s", critical_topic_arn)
+        log.info("✓ Warnings topic: %s", warnings_topic_arn)
+        log.info("")
     except Exception as e:
-        print(f"✗ Error finding SNS topics: {e}")
-        print("Please ensure the monitoring stack is deployed.")
+        log.error("✗ Error finding SNS topics: %s", e)
+        log.info("Please ensure the monitoring stack is deployed.")
         sys.exit(1)
     
-    # Create alarms
-    print("Creating Lambda function alarms...")
-    create_lambda_error_alarms(critical_topic_arn)
-    print()
-    
-    print("Creating DynamoDB alarms...")
-    create_dynamodb_alarms(critical_topic_arn, warnings_topic_arn)
-    print()
-    
-    print("Creating API Gateway alarms...")
-    create_api_gateway_alarms(critical_topic_arn)
-    print()
+    # Build alarm specs
+    log.info("Building alarm specs...")
+    alarm_specs = (
+        lambda_alarm_specs(critical_topic_arn)
+        + dynamodb_alarm_specs(warnings_topic_arn)
+        + api_gateway_alarm_specs(critical_topic_arn)
+        + iot_alarm_specs(warnings_topic_arn)
+    )
+    log.info("")
     
-    print("Creating IoT Core alarms...")
-    create_iot_alarms(warnings_topic_arn)
-    print()
+    # Create alarms
+    log.info("Creating %s metric alarms...", len(alarm_specs))
+    put_metric_alarms(alarm_specs)
+    log.info("")
     
-    print("Creating composite alarms...")
+    log.info("Creating composite alarms...")
     create_composite_alarms(critical_topic_arn)
-    print()
+    log.info("")
     
-    print("=" * 60)
-    print("✓ Production alarm setup complete!")
-    print("=" * 60)
-    print()
-    print("Next steps:")
-    print("1. Verify alarms in CloudWatch console")
-    print("2. Test alarm notifications")
-    print("3. Subscribe email addresses to SNS topics")
-    print()
+    log.info("=" * 60)
+    log.info("✓ Production alarm setup complete!")
+    log.info("=" * 60)
+    log.info("")
+    log.info("Next steps:")
+    log.info("1. Verify alarms in CloudWatch console")
+    log.info("2. Test alarm notifications")
+    log.info("3. Subscribe email addresses to SNS topics")
+    log.info("")
 
 
 if __name__ == '__main__':
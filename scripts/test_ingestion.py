@@ -2,59 +2,175 @@
 Test Data Ingestion Pipeline
 Tests the complete data flow from IoT to DynamoDB
 """
+import argparse
 import boto3
-import json
+from botocore.config import Config
+from botocore.exceptions import ClientError
+import logging
 import time
 import sys
 from datetime import datetime, timezone
+from pathlib import Path
+
+SENSOR_TOPIC = 'carbonready/farm/farm-001/sensor/data'
+LOG_GROUP = '/aws/lambda/carbonready-data-ingestion'
+LOG_WAIT_TIMEOUT = 10  # seconds
+LOG_POLL_INTERVAL = 0.5  # seconds
+
+# Shared client config: back off adaptively rather than fail a test run on
+# throttling. tcp_keepalive only enables OS-level keep-alive probes, which
+# start after the kernel's idle timeout; the log polls reuse a pooled
+# connection regardless.
+BOTO_CONFIG = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+log = logging.getLogger('carbonready')
 
 # AWS clients
-dynamodb = boto3.resource('dynamodb')
-iot_data = boto3.client('iot-data')
-s3 = boto3.client('s3')
-logs = boto3.client('logs')
+dynamodb = boto3.resource('dynamodb', config=BOTO_CONFIG)
+iot_data = boto3.client('iot-data', config=BOTO_CONFIG)
+s3 = boto3.client('s3', config=BOTO_CONFIG)
+logs = boto3.client('logs', config=BOTO_CONFIG)
+
+TABLE_PARAMETER_PATH = '/carbonready/tables/'
+_table_parameters = None
+
+def get_table_parameters():
+    """
+    Get table names published by the data stack in SSM, keyed by logical name
+    
+    A stack without the parameters yields an empty mapping, so callers fall
+    back to scanning; any other SSM error is raised.
+    """
+    global _table_parameters
+    if _table_parameters is None:
+        parameters = {}
+        try:
+            paginator = boto3.client('ssm', config=BOTO_CONFIG).get_paginator('get_parameters_by_path')
+            for page in paginator.paginate(Path=TABLE_PARAMETER_PATH):
+                for parameter in page['Parameters']:
+                    parameters[parameter['Name'].rsplit('/', 1)[-1]] = parameter['Value']
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ParameterNotFound':
+                raise
+        _table_parameters = parameters
+    return _table_parameters
 
 # Get table names from command line or discover them
 def get_table_name(prefix):
     """Get table name by prefix"""
-    client = boto3.client('dynamodb')
+    try:
+        return get_table_parameters()[prefix]
+    except KeyError:
+        pass
+    
+    client = boto3.client('dynamodb', config=BOTO_CONFIG)
     tables = client.list_tables()['TableNames']
     matching = [t for t in tables if prefix in t]
     if matching:
         return matching[0]
     raise Exception(f"No table found with prefix: {prefix}")
 
+def publish_via_mqtt(payload_bytes, count, cert, key, ca, client_id):
+    """
+    Publish the payload count times over one persistent MQTT connection
+    
+    Used for bulk publishes, where the per-request TLS and HTTP framing of
+    the iot-data HTTPS endpoint would dominate. Requires awsiotsdk.
+    """
+    try:
+        from awscrt import mqtt
+        from awsiot import mqtt_connection_builder
+    except ImportError:
+        raise Exception("awsiotsdk is required for --count > 1 (pip install awsiotsdk)")
+    
+    iot_endpoint = boto3.client('iot', config=BOTO_CONFIG).describe_endpoint(
+        endpointType='iot:Data-ATS'
+    )['endpointAddress']
+    
+    connection = mqtt_connection_builder.mtls_from_path(
+        endpoint=iot_endpoint,
+        cert_filepath=cert,
+        pri_key_filepath=key,
+        ca_filepath=ca,
+        client_id=client_id,
+        clean_session=True
+    )
+    connection.connect().result()
+    try:
+        publish_futures = [
+            connection.publish(topic=SENSOR_TOPIC, payload=payload_bytes, qos=mqtt.QoS.AT_LEAST_ONCE)[0]
+            for _ in range(count)
+        ]
+        for future in publish_futures:
+            future.result()
+    finally:
+        connection.disconnect().result()
+
 def get_bucket_name():
     """Get S3 bucket name"""
-    s3_client = boto3.client('s3')
+    s3_client = boto3.client('s3', config=BOTO_CONFIG)
     buckets = s3_client.list_buckets()['Buckets']
     matching = [b['Name'] for b in buckets if 'carbonready' in b['Name'].lower() and 'sensor' in b['Name'].lower()]
     if matching:
         return matching[0]
     raise Exception("No CarbonReady sensor bucket found")
 
-print("=" * 50)
-print("Testing Data Ingestion Pipeline")
-print("=" * 50)
-print()
+parser = argparse.ArgumentParser(description='Test the CarbonReady data ingestion pipeline')
+parser.add_argument(
+    '--count',
+    type=int,
+    default=1,
+    help='Number of messages to publish (default: 1); more than one uses MQTT'
+)
+parser.add_argument('--cert', help='Device certificate for MQTT publishing (e.g., device_certs/test-esp32-001/device.crt)')
+parser.add_argument('--key', help='Device private key for MQTT publishing')
+parser.add_argument('--ca', help='Amazon Root CA for MQTT publishing')
+parser.add_argument(
+    '--client-id',
+    default='test-esp32-001',
+    help='MQTT client ID, must match the IoT Thing name (default: test-esp32-001)'
+)
+parser.add_argument(
+    '-q', '--quiet',
+    action='store_true',
+    help='Only report warnings and errors'
+)
+args = parser.parse_args()
+
+logging.basicConfig(
+    stream=sys.stdout,
+    level=logging.WARNING if args.quiet else logging.INFO,
+    format='%(message)s'
+)
+
+if args.count > 1 and not (args.cert and args.key and args.ca):
+    parser.error('--count > 1 requires --cert, --key and --ca')
+
+log.info("=" * 50)
+log.info("Testing Data Ingestion Pipeline")
+log.info("=" * 50)
+log.info("")
 
 # Discover AWS resources
-print("Discovering AWS resources...")
+log.info("Discovering AWS resources...")
 try:
     SENSOR_DATA_TABLE = get_table_name('SensorDataTable')
     SENSOR_CALIBRATION_TABLE = get_table_name('SensorCalibrationTable')
     BUCKET_NAME = get_bucket_name()
-    print(f"✓ Found sensor data table: {SENSOR_DATA_TABLE}")
-    print(f"✓ Found calibration table: {SENSOR_CALIBRATION_TABLE}")
-    print(f"✓ Found S3 bucket: {BUCKET_NAME}")
+    log.info("✓ Found sensor data table: %s", SENSOR_DATA_TABLE)
+    log.info("✓ Found calibration table: %s", SENSOR_CALIBRATION_TABLE)
+    log.info("✓ Found S3 bucket: %s", BUCKET_NAME)
 except Exception as e:
-    print(f"✗ Error discovering resources: {e}")
-    print("Make sure AWS infrastructure is deployed")
+    log.error("✗ Error discovering resources: %s", e)
+    log.info("Make sure AWS infrastructure is deployed")
     sys.exit(1)
 
-print()
+log.info("")
 # Step 1: Create sensor calibration
-print("Step 1: Creating sensor calibration...")
+log.info("Step 1: Creating sensor calibration...")
 calibration_table = dynamodb.Table(SENSOR_CALIBRATION_TABLE)
 
 try:
@@ -68,110 +184,123 @@ try:
             'soilMoistureWet': 1200
         }
     })
-    print("✓ Sensor calibration created")
+    log.info("✓ Sensor calibration created")
 except Exception as e:
-    print(f"✗ Error creating calibration: {e}")
+    log.error("✗ Error creating calibration: %s", e)
 
-print()
+log.info("")
 
 # Step 2: Load and publish test data
-print("Step 2: Publishing sensor data to IoT Core...")
+log.info("Step 2: Publishing sensor data to IoT Core...")
 
 try:
-    with open('test-valid-sensor-data.json', 'r') as f:
-        payload = json.load(f)
+    payload_bytes = Path('test-valid-sensor-data.json').read_bytes()
     
-    response = iot_data.publish(
-        topic='carbonready/farm/farm-001/sensor/data',
-        qos=1,
-        payload=json.dumps(payload)
-    )
-    print("✓ Data published successfully")
+    publish_ts = int(time.time() * 1000)
+    if args.count > 1:
+        publish_via_mqtt(payload_bytes, args.count, args.cert, args.key, args.ca, args.client_id)
+        log.info("✓ %s messages published successfully over MQTT", args.count)
+    else:
+        response = iot_data.publish(
+            topic=SENSOR_TOPIC,
+            qos=1,
+            payload=payload_bytes
+        )
+        log.info("✓ Data published successfully")
 except FileNotFoundError:
-    print("✗ test-valid-sensor-data.json not found")
-    print("  Run: python scripts/test_system.py")
+    log.error("✗ test-valid-sensor-data.json not found")
+    log.info("  Run: python scripts/test_system.py")
     exit(1)
 except Exception as e:
-    print(f"✗ Error publishing data: {e}")
+    log.error("✗ Error publishing data: %s", e)
     exit(1)
 
-print()
+log.info("")
 
 # Step 3: Wait for Lambda to process
-print("Step 3: Waiting for Lambda to process (5 seconds)...")
-time.sleep(5)
+log.info("Step 3: Waiting for Lambda to process (up to %s seconds)...", LOG_WAIT_TIMEOUT)
+invocation_finished = False
+try:
+    deadline = time.time() + LOG_WAIT_TIMEOUT
+    while time.time() < deadline:
+        report = logs.filter_log_events(
+            logGroupName=LOG_GROUP,
+            startTime=publish_ts,
+            filterPattern='REPORT'
+        )
+        if report['events']:
+            invocation_finished = True
+            break
+        time.sleep(LOG_POLL_INTERVAL)
+    
+    if invocation_finished:
+        log.info("✓ Lambda invocation completed")
+    else:
+        log.warning("⚠ No Lambda REPORT line within %s seconds", LOG_WAIT_TIMEOUT)
+except Exception as e:
+    log.info("  Could not poll logs: %s", e)
 
 # Step 4: Check CloudWatch Logs
-print("Step 4: Checking CloudWatch Logs...")
+log.info("Step 4: Checking CloudWatch Logs...")
 try:
-    log_group = '/aws/lambda/carbonready-data-ingestion'
-    
-    # Get log streams
-    streams_response = logs.describe_log_streams(
-        logGroupName=log_group,
-        orderBy='LastEventTime',
-        descending=True,
-        limit=1
+    events_response = logs.filter_log_events(
+        logGroupName=LOG_GROUP,
+        startTime=publish_ts
     )
     
-    if streams_response['logStreams']:
-        stream_name = streams_response['logStreams'][0]['logStreamName']
-        
-        # Get recent log events
-        events_response = logs.get_log_events(
-            logGroupName=log_group,
-            logStreamName=stream_name,
-            limit=20,
-            startFromHead=False
-        )
-        
-        print("Recent logs:")
+    if events_response['events']:
+        log.info("Recent logs:")
         for event in events_response['events'][-10:]:
-            print(f"  {event['message'].strip()}")
+            log.info("  %s", event['message'].strip())
     else:
-        print("  No log streams found")
+        log.info("  No log events found")
         
 except Exception as e:
-    print(f"  Could not fetch logs: {e}")
+    log.info("  Could not fetch logs: %s", e)
 
-print()
+log.info("")
 
 # Step 5: Verify data in DynamoDB
-print("Step 5: Checking DynamoDB for sensor data...")
+log.info("Step 5: Checking DynamoDB for sensor data...")
 sensor_table = dynamodb.Table(SENSOR_DATA_TABLE)
 
 try:
     response = sensor_table.query(
         KeyConditionExpression='farmId = :farmId',
         ExpressionAttributeValues={':farmId': 'farm-001'},
+        ProjectionExpression=(
+            'farmId, deviceId, #ts, soilMoisture, soilTemperature, '
+            'airTemperature, humidity, validationStatus'
+        ),
+        ExpressionAttributeNames={'#ts': 'timestamp'},
         Limit=5,
         ScanIndexForward=False
     )
     
     if response['Items']:
-        print(f"✓ Found {len(response['Items'])} sensor reading(s) in DynamoDB")
-        print()
-        print("Latest reading:")
+        log.info("✓ Found %s sensor reading(s) in DynamoDB", len(response['Items']))
+        log.info("")
+        log.info("Latest reading:")
         latest = response['Items'][0]
-        print(f"  Farm ID: {latest.get('farmId')}")
-        print(f"  Device ID: {latest.get('deviceId')}")
-        print(f"  Timestamp: {latest.get('timestamp')}")
-        print(f"  Soil Moisture: {latest.get('soilMoisture')}%")
-        print(f"  Soil Temperature: {latest.get('soilTemperature')}°C")
-        print(f"  Air Temperature: {latest.get('airTemperature')}°C")
-        print(f"  Humidity: {latest.get('humidity')}%")
-        print(f"  Validation Status: {latest.get('validationStatus')}")
+        log.info("  Farm ID: %s", latest.get('farmId'))
+        log.info("  Device ID: %s", latest.get('deviceId'))
+        log.info("  Timestamp: %s", latest.get('timestamp'))
+        log.info("  Soil Moisture: %s%%", latest.get('soilMoisture'))
+        log.info("  Soil Temperature: %s°C", latest.get('soilTemperature'))
+        log.info("  Air Temperature: %s°C", latest.get('airTemperature'))
+        log.info("  Humidity: %s%%", latest.get('humidity'))
+        log.info("  Validation Status: %s", latest.get('validationStatus'))
     else:
-        print("✗ No sensor data found in DynamoDB")
-        print("  Check CloudWatch logs above for errors")
+        log.error("✗ No sensor data found in DynamoDB")
+        log.info("  Check CloudWatch logs above for errors")
         
 except Exception as e:
-    print(f"✗ Error querying DynamoDB: {e}")
+    log.error("✗ Error querying DynamoDB: %s", e)
 
-print()
+log.info("")
 
 # Step 6: Check S3 for archived data
-print("Step 6: Checking S3 for archived data...")
+log.info("Step 6: Checking S3 for archived data...")
 try:
     now = datetime.now(timezone.utc)
     prefix = f"raw/year={now.year}/month={now.month:02d}/day={now.day:02d}/"
@@ -183,16 +312,16 @@ try:
     )
     
     if 'Contents' in response and response['Contents']:
-        print(f"✓ Found {len(response['Contents'])} file(s) in S3")
+        log.info("✓ Found %s file(s) in S3", len(response['Contents']))
         for obj in response['Contents']:
-            print(f"  {obj['Key']} ({obj['Size']} bytes)")
+            log.info("  %s (%s bytes)", obj['Key'], obj['Size'])
     else:
-        print("⚠ No S3 data found yet (may take a moment)")
+        log.warning("⚠ No S3 data found yet (may take a moment)")
         
 except Exception as e:
-    print(f"⚠ Could not check S3: {e}")
+    log.warning("⚠ Could not check S3: %s", e)
 
-print()
-print("=" * 50)
-print("Test Complete!")
-print("=" * 50)
+log.info("")
+log.info("=" * 50)
+log.info("Test Complete!")
+log.info("=" * 50)
@@ -2,10 +2,20 @@
 Test Lambda Function Directly
 Invokes the data ingestion Lambda with a test payload
 """
+import base64
 import boto3
+from botocore.config import Config
 import json
 
-lambda_client = boto3.client('lambda')
+FUNCTION_NAME = 'carbonready-data-ingestion'
+
+# Invoke synchronously, but never let botocore retry the invoke: a retried
+# invoke runs the function again, and the read timeout covers the function's
+# longest possible run so a slow invocation is never re-sent
+lambda_client = boto3.client(
+    'lambda',
+    config=Config(read_timeout=900, retries={'max_attempts': 0})
+)
 
 print("=" * 50)
 print("Testing Lambda Function Directly")
@@ -14,31 +24,40 @@ print()
 
 # Load test payload
 print("Loading test payload...")
-with open('test-valid-sensor-data.json', 'r') as f:
-    payload = json.load(f)
+with open('test-valid-sensor-data.json', 'rb') as f:
+    payload_bytes = f.read()
 
-print(f"Payload: {json.dumps(payload, indent=2)}")
+# Parsed only for display; the raw bytes are sent as-is
+print(f"Payload: {json.dumps(json.loads(payload_bytes), indent=2)}")
 print()
 
-# Invoke Lambda directly
+# Invoke Lambda
 print("Invoking Lambda function...")
 try:
     response = lambda_client.invoke(
-        FunctionName='carbonready-data-ingestion',
+        FunctionName=FUNCTION_NAME,
         InvocationType='RequestResponse',
-        Payload=json.dumps(payload)
+        LogType='Tail',
+        Payload=payload_bytes
     )
-    
+
     # Parse response
     response_payload = json.loads(response['Payload'].read())
-    
+
     print(f"Status Code: {response['StatusCode']}")
     print(f"Response: {json.dumps(response_payload, indent=2)}")
-    
-    if response['StatusCode'] == 200:
+
+    # The last 4 KB of the invocation's log, including the handler's
+    # structured status lines
+    if 'LogResult' in response:
+        print("Invocation logs:")
+        for line in base64.b64decode(response['LogResult']).decode(errors='replace').splitlines():
+            print(f"  {line}")
+
+    if response['StatusCode'] == 200 and 'FunctionError' not in response:
         print()
         print("✓ Lambda invoked successfully!")
-        
+
         if response_payload.get('status') == 'success':
             print("✓ Data ingestion succeeded!")
         else:
@@ -46,9 +65,11 @@ try:
             print(f"  Reason: {response_payload.get('reason')}")
             if 'errors' in response_payload:
                 print(f"  Errors: {response_payload.get('errors')}")
+    elif 'FunctionError' in response:
+        print(f"✗ Lambda function error: {response_payload.get('errorMessage')}")
     else:
         print(f"✗ Lambda invocation failed with status {response['StatusCode']}")
-        
+
 except Exception as e:
     print(f"✗ Error invoking Lambda: {e}")
     import traceback
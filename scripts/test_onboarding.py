@@ -8,42 +8,84 @@ This creates a test farm and verifies all components.
 Usage:
     python scripts/test_onboarding.py
 """
-import subprocess
+import asyncio
 import sys
+import tempfile
 import time
 from datetime import datetime
+from pathlib import Path
+
+COMMAND_TIMEOUT = 300  # seconds
+OUTPUT_HEAD_CHARS = 500
+LOG_DIR = Path(tempfile.gettempdir()) / 'carbonready-onboarding'
+
+def format_header(message):
+    return f"\n{'=' * 70}\n{message}\n{'=' * 70}"
 
 def print_header(message):
-    print(f"\n{'=' * 70}")
-    print(message)
-    print('=' * 70)
+    print(format_header(message))
+
+def read_head(path, limit=OUTPUT_HEAD_CHARS):
+    """Read only the first limit characters of a log file"""
+    with open(path, 'rb') as f:
+        return f.read(limit).decode(errors='replace')[:limit]
 
-def run_command(cmd, description):
-    """Run a command and return success status"""
-    print(f"\n{description}...")
-    print(f"Command: {' '.join(cmd)}")
+async def run_command_async(cmd, description, log_path):
+    """
+    Run a command and return success status and its report
+    
+    Output goes straight to log_path (stdout) and log_path.err (stderr), so
+    the full logs survive for post-mortem and only their heads are read
+    back. The report is returned rather than printed so that concurrent
+    commands do not interleave their output.
+    """
+    err_path = log_path.with_suffix(log_path.suffix + '.err')
+    lines = [f"\n{description}...", f"Command: {' '.join(cmd)}", f"Log: {log_path}"]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        with open(log_path, 'wb') as out_file, open(err_path, 'wb') as err_file:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=out_file,
+                stderr=err_file
+            )
+            try:
+                returncode = await asyncio.wait_for(proc.wait(), COMMAND_TIMEOUT)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                lines.append("✗ Timeout")
+                return False, '\n'.join(lines)
         
-        if result.returncode == 0:
-            print("✓ Success")
-            if result.stdout:
-                print("Output:")
-                print(result.stdout[:500])  # First 500 chars
-            return True
+        stdout = read_head(log_path)
+        stderr = read_head(err_path)
+        if returncode == 0:
+            lines.append("✓ Success")
+            if stdout:
+                lines.append("Output:")
+                lines.append(stdout)
+            return True, '\n'.join(lines)
         else:
-            print("✗ Failed")
-            if result.stderr:
-                print("Error:")
-                print(result.stderr[:500])
-            return False
-    except subprocess.TimeoutExpired:
-        print("✗ Timeout")
-        return False
+            lines.append("✗ Failed")
+            if stderr:
+                lines.append("Error:")
+                lines.append(stderr)
+            return False, '\n'.join(lines)
     except Exception as e:
-        print(f"✗ Exception: {e}")
-        return False
+        lines.append(f"✗ Exception: {e}")
+        return False, '\n'.join(lines)
+
+async def run_test(title, cmd, description, log_path):
+    """Run one onboarding test and return success status and its full report"""
+    success, report = await run_command_async(cmd, description, log_path)
+    return success, f"{format_header(title)}\n{report}"
+
+async def run_onboarding_tests(onboarding_tests, log_dir):
+    """Run independent onboarding tests concurrently"""
+    return await asyncio.gather(*(
+        run_test(title, cmd, description, log_dir / log_name)
+        for title, cmd, description, log_name in onboarding_tests
+    ))
 
 def main():
     print_header("CarbonReady Onboarding Script Test")
@@ -56,69 +98,84 @@ def main():
     print(f"\nTest Farm ID: {test_farm_id}")
     print(f"Test Device ID: {test_device_id}")
     
-    results = []
-    
-    # Test 1: Run onboarding script with coconut farm
-    print_header("Test 1: Onboard Coconut Farm")
-    success = run_command(
-        [
-            'python', 'scripts/onboard_farm.py',
-            test_farm_id, test_device_id,
-            '--crop-type', 'coconut',
-            '--tree-age', '15',
-            '--tree-height', '12.5',
-            '--farm-size', '2.0',
-            '--plantation-density', '180',
-            '--skip-verification'  # Skip verification for faster test
-        ],
-        "Running onboarding script for coconut farm"
-    )
-    results.append(("Coconut farm onboarding", success))
-    
-    # Test 2: Run onboarding script with cashew farm
-    print_header("Test 2: Onboard Cashew Farm")
+    log_dir = LOG_DIR / timestamp
+    log_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Command logs: {log_dir}")
+    
     test_farm_id_2 = f"test-farm-{timestamp}-2"
     test_device_id_2 = f"test-esp32-{timestamp}-2"
+    test_farm_id_3 = f"test-farm-{timestamp}-3"
+    test_device_id_3 = f"test-esp32-{timestamp}-3"
     
-    success = run_command(
-        [
-            'python', 'scripts/onboard_farm.py',
-            test_farm_id_2, test_device_id_2,
-            '--crop-type', 'cashew',
-            '--tree-age', '10',
-            '--dbh', '28.5',
-            '--farm-size', '3.0',
-            '--plantation-density', '250',
-            '--skip-verification'  # Skip verification for faster test
-        ],
-        "Running onboarding script for cashew farm"
-    )
-    results.append(("Cashew farm onboarding", success))
+    # Tests 1, 2 and 4 onboard different farms, so they run concurrently
+    onboarding_tests = [
+        (
+            "Test 1: Onboard Coconut Farm",
+            [
+                'python', 'scripts/onboard_farm.py',
+                test_farm_id, test_device_id,
+                '--crop-type', 'coconut',
+                '--tree-age', '15',
+                '--tree-height', '12.5',
+                '--farm-size', '2.0',
+                '--plantation-density', '180',
+                '--skip-verification'  # Skip verification for faster test
+            ],
+            "Running onboarding script for coconut farm",
+            "test-1.log"
+        ),
+        (
+            "Test 2: Onboard Cashew Farm",
+            [
+                'python', 'scripts/onboard_farm.py',
+                test_farm_id_2, test_device_id_2,
+                '--crop-type', 'cashew',
+                '--tree-age', '10',
+                '--dbh', '28.5',
+                '--farm-size', '3.0',
+                '--plantation-density', '250',
+                '--skip-verification'  # Skip verification for faster test
+            ],
+            "Running onboarding script for cashew farm",
+            "test-2.log"
+        ),
+        (
+            "Test 4: Onboard with Defaults",
+            [
+                'python', 'scripts/onboard_farm.py',
+                test_farm_id_3, test_device_id_3,
+                '--crop-type', 'coconut',
+                '--skip-device',  # Skip device provisioning
+                '--skip-verification'  # Skip verification
+            ],
+            "Running onboarding with default values",
+            "test-4.log"
+        )
+    ]
+    onboarding_results = asyncio.run(run_onboarding_tests(onboarding_tests, log_dir))
+    
+    (coconut_success, coconut_report), (cashew_success, cashew_report), \
+        (defaults_success, defaults_report) = onboarding_results
+    print(coconut_report)
+    print(cashew_report)
     
     # Test 3: Verify help message
     print_header("Test 3: Verify Help Message")
-    success = run_command(
+    help_success, help_report = asyncio.run(run_command_async(
         ['python', 'scripts/onboard_farm.py', '--help'],
-        "Checking help message"
-    )
-    results.append(("Help message", success))
-    
-    # Test 4: Test with minimal arguments (defaults)
-    print_header("Test 4: Onboard with Defaults")
-    test_farm_id_3 = f"test-farm-{timestamp}-3"
-    test_device_id_3 = f"test-esp32-{timestamp}-3"
-    
-    success = run_command(
-        [
-            'python', 'scripts/onboard_farm.py',
-            test_farm_id_3, test_device_id_3,
-            '--crop-type', 'coconut',
-            '--skip-device',  # Skip device provisioning
-            '--skip-verification'  # Skip verification
-        ],
-        "Running onboarding with default values"
-    )
-    results.append(("Onboarding with defaults", success))
+        "Checking help message",
+        log_dir / "test-3.log"
+    ))
+    print(help_report)
+    
+    print(defaults_report)
+    
+    results = [
+        ("Coconut farm onboarding", coconut_success),
+        ("Cashew farm onboarding", cashew_success),
+        ("Help message", help_success),
+        ("Onboarding with defaults", defaults_success)
+    ]
     
     # Summary
     print_header("Test Summary")
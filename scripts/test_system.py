@@ -5,60 +5,85 @@ Tests the deployed infrastructure end-to-end
 import json
 import hashlib
 import sys
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import time
+from pathlib import Path
 
-def create_test_payload(farm_id="farm-001", device_id="test-esp32-001"):
-    """Create a test sensor payload with valid hash"""
-    payload = {
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Fresh SHA-256 state, copied per payload instead of re-initialising one
+SHA256_PROTO = hashlib.sha256()
+
+def sign_payload(payload):
+    """
+    Add the SHA-256 hash the ingestion Lambda verifies
+    
+    The hash input must match the Lambda byte for byte, so this keeps
+    json.dumps(sort_keys=True) with its default separators.
+    """
+    payload_bytes = json.dumps(payload, sort_keys=True).encode('ascii')
+    digest = SHA256_PROTO.copy()
+    digest.update(payload_bytes)
+    payload['hash'] = digest.hexdigest()
+    return payload
+
+VALID_READINGS = {
+    "soilMoisture": 45.5,
+    "soilTemperature": 25.3,
+    "airTemperature": 28.7,
+    "humidity": 65.2
+}
+
+def base_payload(farm_id, device_id, readings):
+    """Create an unsigned sensor payload"""
+    return {
         "farmId": farm_id,
         "deviceId": device_id,
-        "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "readings": {
-            "soilMoisture": 45.5,
-            "soilTemperature": 25.3,
-            "airTemperature": 28.7,
-            "humidity": 65.2
-        }
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "readings": dict(readings)
     }
-    
-    # Compute SHA-256 hash
-    payload_str = json.dumps(payload, sort_keys=True)
-    payload['hash'] = hashlib.sha256(payload_str.encode()).hexdigest()
-    
-    return payload
+
+def create_test_payload(farm_id="farm-001", device_id="test-esp32-001"):
+    """Create a test sensor payload with valid hash"""
+    return sign_payload(base_payload(farm_id, device_id, VALID_READINGS))
 
 def create_bad_hash_payload(farm_id="farm-001", device_id="test-esp32-001"):
     """Create a test payload with invalid hash (for testing tampering detection)"""
-    payload = create_test_payload(farm_id, device_id)
+    payload = base_payload(farm_id, device_id, VALID_READINGS)
     payload['hash'] = "invalid_hash_12345"
     return payload
 
 def create_invalid_data_payload(farm_id="farm-001", device_id="test-esp32-001"):
     """Create a test payload with out-of-range values"""
-    payload = {
-        "farmId": farm_id,
-        "deviceId": device_id,
-        "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "readings": {
-            "soilMoisture": 150.0,  # Invalid: > 100
-            "soilTemperature": 25.3,
-            "airTemperature": 28.7,
-            "humidity": 65.2
-        }
-    }
+    readings = dict(VALID_READINGS, soilMoisture=150.0)  # Invalid: > 100
     
     # Compute valid hash (but data is invalid)
-    payload_str = json.dumps(payload, sort_keys=True)
-    payload['hash'] = hashlib.sha256(payload_str.encode()).hexdigest()
-    
-    return payload
+    return sign_payload(base_payload(farm_id, device_id, readings))
 
 def save_payload(payload, filename):
     """Save payload to JSON file"""
-    with open(filename, 'w') as f:
-        json.dump(payload, f, indent=2)
+    if orjson is not None:
+        Path(filename).write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        with open(filename, 'w') as f:
+            json.dump(payload, f, indent=2)
     print(f"✓ Created {filename}")
 
+# kind -> (creator, output file)
+PAYLOAD_KINDS = {
+    "valid": (create_test_payload, "test-valid-sensor-data.json"),  # 1. Valid payload
+    "bad-hash": (create_bad_hash_payload, "test-bad-hash-data.json"),  # 2. Tampering test
+    "invalid": (create_invalid_data_payload, "test-invalid-data.json"),  # 3. Validation test
+}
+
+def _make(kind, farm_id="farm-001", device_id="test-esp32-001"):
+    """Build one payload in a worker process; returns (filename, payload)"""
+    create, filename = PAYLOAD_KINDS[kind]
+    return filename, create(farm_id, device_id)
+
 if __name__ == "__main__":
     print("CarbonReady System Test Payload Generator")
     print("=" * 50)
@@ -66,17 +91,10 @@ if __name__ == "__main__":
     # Create test payloads
     print("\nGenerating test payloads...")
     
-    # 1. Valid payload
-    valid_payload = create_test_payload()
-    save_payload(valid_payload, "test-valid-sensor-data.json")
-    
-    # 2. Invalid hash payload (for tampering test)
-    bad_hash_payload = create_bad_hash_payload()
-    save_payload(bad_hash_payload, "test-bad-hash-data.json")
-    
-    # 3. Invalid data payload (for validation test)
-    invalid_data_payload = create_invalid_data_payload()
-    save_payload(invalid_data_payload, "test-invalid-data.json")
+    # Hashing runs in worker processes; files are written here in a fixed order
+    with ProcessPoolExecutor() as executor:
+        for filename, payload in executor.map(_make, PAYLOAD_KINDS):
+            save_payload(payload, filename)
     
     print("\n" + "=" * 50)
     print("Test payloads created successfully!")
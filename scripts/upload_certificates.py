@@ -10,11 +10,16 @@ Requirements: 11.3, 22.2
 import subprocess
 import sys
 import argparse
+import hashlib
+import re
 from pathlib import Path
 import serial.tools.list_ports
 import tempfile
 import shutil
 
+# USB-serial bridges ESP32 boards typically show up as
+ESP32_PORT_PATTERN = re.compile(r'CP210|CH340|UART|USB')
+
 def find_esp32_port():
     """
     Auto-detect ESP32 serial port
@@ -25,7 +30,7 @@ def find_esp32_port():
     esp32_ports = []
     
     for port in ports:
-        if any(chip in port.description.upper() for chip in ['CP210', 'CH340', 'UART', 'USB']):
+        if ESP32_PORT_PATTERN.search(port.description.upper()):
             esp32_ports.append(port.device)
             print(f"  Found potential ESP32: {port.device} - {port.description}")
     
@@ -49,6 +54,20 @@ def find_esp32_port():
         except (ValueError, KeyboardInterrupt):
             return None
 
+def file_digest(path):
+    """
+    BLAKE2b fingerprint of a file's contents
+    """
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).digest()
+
+def is_up_to_date(src, dst):
+    """
+    True if dst already holds the same bytes as src
+    """
+    if not dst.exists() or src.stat().st_size != dst.stat().st_size:
+        return False
+    return file_digest(src) == file_digest(dst)
+
 def prepare_spiffs_data(device_id, cert_dir):
     """
     Prepare SPIFFS data directory with certificates
@@ -61,11 +80,6 @@ def prepare_spiffs_data(device_id, cert_dir):
         print(f"   Run: python scripts/provision_device.py {device_id} <farm_id>")
         return None
     
-    # Create temporary SPIFFS data directory
-    spiffs_data_dir = Path("firmware/esp32/data")
-    spiffs_data_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Copy certificates to SPIFFS data directory
     files_to_copy = [
         ("device.crt", "device.crt"),
         ("device.key", "device.key"),
@@ -73,16 +87,29 @@ def prepare_spiffs_data(device_id, cert_dir):
         ("device_config.json", "config.json")
     ]
     
-    for src_name, dst_name in files_to_copy:
-        src_file = device_cert_dir / src_name
-        dst_file = spiffs_data_dir / dst_name
-        
-        if src_file.exists():
-            shutil.copy2(src_file, dst_file)
-            print(f"  ✓ Copied {src_name} -> {dst_name}")
-        else:
+    # Check every source before writing anything, so a missing file never
+    # leaves a partially assembled SPIFFS image behind
+    missing = [src_name for src_name, _ in files_to_copy
+               if not (device_cert_dir / src_name).exists()]
+    if missing:
+        for src_name in missing:
             print(f"  ⚠️  Missing: {src_name}")
-            return None
+        return None
+    
+    # Create temporary SPIFFS data directory
+    spiffs_data_dir = Path("firmware/esp32/data")
+    spiffs_data_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Copy certificates to SPIFFS data directory
+    for src_name, dst_name in files_to_copy:
+        src, dst = device_cert_dir / src_name, spiffs_data_dir / dst_name
+        # Re-runs after a failed upload usually find the files already in place
+        if is_up_to_date(src, dst):
+            print(f"  ✓ Up to date: {dst_name}")
+            continue
+        # Contents only: metadata is irrelevant once packed into SPIFFS
+        shutil.copyfile(src, dst)
+        print(f"  ✓ Copied {src_name} -> {dst_name}")
     
     print(f"✓ SPIFFS data prepared in: {spiffs_data_dir}")
     return spiffs_data_dir
@@ -101,21 +128,25 @@ def upload_spiffs(port=None):
         cmd.extend(["--upload-port", port])
     
     try:
-        result = subprocess.run(
+        # Stream PlatformIO output as it arrives instead of buffering it all
+        print("\n📋 Upload output:")
+        proc = subprocess.Popen(
             cmd,
             cwd=firmware_dir,
-            capture_output=True,
-            text=True
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1
         )
+        for line in proc.stdout:
+            print(line, end='')
+        returncode = proc.wait()
         
-        if result.returncode == 0:
+        if returncode == 0:
             print("✓ SPIFFS uploaded successfully")
-            print("\n📋 Upload output:")
-            print(result.stdout)
             return True
         else:
-            print(f"❌ SPIFFS upload failed:")
-            print(result.stderr)
+            print(f"❌ SPIFFS upload failed (exit code {returncode})")
             return False
             
     except FileNotFoundError:
@@ -3,49 +3,242 @@
 Verify Production Deployment
 Checks that all CarbonReady infrastructure components are deployed correctly
 """
+import asyncio
 import boto3
+import functools
+import json
+import os
+import re
 import sys
+import threading
+import time
 import argparse
-from typing import Dict, List, Tuple
-from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 
-# Initialize AWS clients
-dynamodb = boto3.client('dynamodb')
-s3 = boto3.client('s3')
-lambda_client = boto3.client('lambda')
-apigateway = boto3.client('apigateway')
-iot = boto3.client('iot')
-sns = boto3.client('sns')
-cloudwatch = boto3.client('cloudwatch')
-cognito = boto3.client('cognito-idp')
+# Per-resource AWS calls are pure network I/O, so they fan out over a pool
+MAX_WORKERS = 16
+
+# Shared by every client. The pool is wide enough for the probe fan-out, and
+# retries are capped low: this is an interactive check, so a failing call
+# is better reported quickly than retried with backoff. Client-side
+# parameter validation is skipped for these fixed, read-only calls; AWS
+# still validates every request server-side.
+BOTO_CONFIG = Config(
+    max_pool_connections=32,
+    retries={'max_attempts': 2, 'mode': 'standard'},
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=10,
+    parameter_validation=False
+)
+
+# Service errors and transport errors (timeouts, unreachable endpoints) both
+# become per-check failures rather than aborting the run
+AWS_ERRORS = (ClientError, BotoCoreError)
+
+# CloudFormation-generated names look like <stack>-<LogicalId><8 hex hash>-<suffix>
+CFN_NAME_PATTERN = re.compile(r'-([A-Za-z0-9]+?)[0-9A-F]{8}-[0-9A-Z]+$')
+
+# Published by the API stack
+API_ID_PARAMETER = '/carbonready/api/id'
+
+# With --cache, healthy table states are reused by runs within CACHE_TTL.
+# list_tables still runs, so a deleted table is caught, but a table that
+# has since gone to DELETING or UPDATING is not; caching is therefore
+# opt-in and meant for interactive re-runs, never for the deploy gate.
+# Functions are never cached: only GetFunction confirms they exist.
+CACHE_DIR = Path.home() / '.cache' / 'carbonready'
+CACHE_TTL = 600  # seconds
+
+# Client creation on a shared session is not thread-safe
+_client_lock = threading.Lock()
+
+
+def create_session(region: str) -> boto3.Session:
+    """
+    Create the session every client is built from
+    
+    Credentials are resolved here, once, so the concurrent checks don't
+    each go looking for them (and hit IMDS) on first use.
+    """
+    session = boto3.Session(region_name=region)
+    credentials = session.get_credentials()
+    if credentials is not None:
+        credentials.get_frozen_credentials()
+    return session
+
+
+@functools.lru_cache(maxsize=None)
+def get_client(session: boto3.Session, name: str):
+    """Create an AWS client on first use and reuse it afterwards"""
+    with _client_lock:
+        return session.client(name, config=BOTO_CONFIG)
+
+
+# Piped or redirected output gets no ANSI escapes
+USE_COLOR = sys.stdout.isatty()
+OUTPUT_ENCODING = sys.stdout.encoding or 'utf-8'
 
 
 class Colors:
-    """ANSI color codes for terminal output"""
-    GREEN = '\033[92m'
-    RED = '\033[91m'
-    YELLOW = '\033[93m'
-    BLUE = '\033[94m'
-    END = '\033[0m'
-
-
-def print_status(message: str, status: str):
-    """Print colored status message"""
-    if status == 'OK':
-        print(f"{Colors.GREEN}✓{Colors.END} {message}")
-    elif status == 'FAIL':
-        print(f"{Colors.RED}✗{Colors.END} {message}")
-    elif status == 'WARN':
-        print(f"{Colors.YELLOW}⚠{Colors.END} {message}")
-    else:
-        print(f"{Colors.BLUE}ℹ{Colors.END} {message}")
+    """ANSI color codes for terminal output (empty when not a terminal)"""
+    GREEN = '\033[92m' if USE_COLOR else ''
+    RED = '\033[91m' if USE_COLOR else ''
+    YELLOW = '\033[93m' if USE_COLOR else ''
+    BLUE = '\033[94m' if USE_COLOR else ''
+    END = '\033[0m' if USE_COLOR else ''
+
+
+# Encoded once, so printing a line is a lookup plus a concatenation
+_STATUS_PREFIX = {
+    status: prefix.encode(OUTPUT_ENCODING, 'replace')
+    for status, prefix in {
+        'OK': f"{Colors.GREEN}✓{Colors.END} ",
+        'FAIL': f"{Colors.RED}✗{Colors.END} ",
+        'WARN': f"{Colors.YELLOW}⚠{Colors.END} ",
+        'INFO': f"{Colors.BLUE}ℹ{Colors.END} "
+    }.items()
+}
+
+
+def print_status_lines(lines: List[Tuple[str, str]]):
+    """Print (message, status) lines with their status prefixes in one write"""
+    block = b''.join(
+        _STATUS_PREFIX.get(status, _STATUS_PREFIX['INFO'])
+        + message.encode(OUTPUT_ENCODING, 'replace') + b'\n'
+        for message, status in lines
+    )
+    # Flush what print() has buffered so the two streams stay in order
+    sys.stdout.flush()
+    sys.stdout.buffer.write(block)
+    sys.stdout.buffer.flush()
+
 
+@dataclass(slots=True)
+class CheckResult:
+    """
+    Counts and (message, status) lines from a check or one of its probes
+    
+    Results add up field by field, so a check is the sum of its probes and
+    probes can return from worker threads without sharing any counters.
+    """
+    ok: int = 0
+    fail: int = 0
+    lines: List[Tuple[str, str]] = field(default_factory=list)
+    
+    def __add__(self, other: 'CheckResult') -> 'CheckResult':
+        return CheckResult(self.ok + other.ok, self.fail + other.fail, self.lines + other.lines)
+    
+    def as_dict(self, name: str) -> Dict:
+        """JSON-ready form of a check's result"""
+        return {
+            'name': name,
+            'ok': self.ok,
+            'fail': self.fail,
+            'items': [{'message': message, 'status': status} for message, status in self.lines]
+        }
+    
+    @classmethod
+    def passed(cls, message: str) -> 'CheckResult':
+        """One item that passed"""
+        return cls(ok=1, lines=[(message, 'OK')])
+    
+    @classmethod
+    def failed(cls, message: str, status: str = 'FAIL', count: int = 1) -> 'CheckResult':
+        """count items that failed, reported on one line"""
+        return cls(fail=count, lines=[(message, status)])
+    
+    @classmethod
+    def note(cls, message: str, status: str) -> 'CheckResult':
+        """A status line that counts neither way"""
+        return cls(lines=[(message, status)])
 
-def check_dynamodb_tables() -> Tuple[int, int]:
+
+class ResultCache:
+    """
+    Healthy per-resource results from recent runs, persisted as JSON
+    
+    Only healthy states are stored, so anything that was missing or
+    unhealthy is always checked again.
+    """
+    
+    def __init__(self, path: Path, ttl: float = CACHE_TTL, load: bool = True):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if load:
+            try:
+                entries = json.loads(path.read_text())
+            except (OSError, ValueError):
+                entries = {}
+            now = time.time()
+            self._entries = {
+                key: entry for key, entry in entries.items() if now - entry[0] < ttl
+            }
+    
+    def get(self, kind: str, name: str):
+        """Cached value for a resource, or None"""
+        entry = self._entries.get(f"{kind}:{name}")
+        return entry[1] if entry else None
+    
+    def put(self, kind: str, name: str, value):
+        """Record a healthy result"""
+        with self._lock:
+            self._entries[f"{kind}:{name}"] = [time.time(), value]
+    
+    def save(self):
+        """Write the cache atomically; a cache that can't be written is skipped"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(self._entries))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+def error_code(error: Exception) -> Optional[str]:
+    """Return the AWS error code of a ClientError, or None for transport errors"""
+    if isinstance(error, ClientError):
+        return error.response['Error']['Code']
+    return None
+
+
+def index_by_logical_id(names: List[str]) -> Dict[str, str]:
+    """Map CloudFormation-generated resource names by the logical ID they came from"""
+    index = {}
+    for name in names:
+        match = CFN_NAME_PATTERN.search(name)
+        if match:
+            index.setdefault(match.group(1), name)
+    return index
+
+
+@functools.lru_cache(maxsize=None)
+def table_status(dynamodb, table_name: str) -> str:
+    """TableStatus of a DynamoDB table, described at most once per run"""
+    return dynamodb.describe_table(TableName=table_name)['Table']['TableStatus']
+
+
+@functools.lru_cache(maxsize=None)
+def find_user_pool(cognito):
+    """First user pool whose name contains 'carbonready', or None"""
+    pages = cognito.get_paginator('list_user_pools').paginate(
+        PaginationConfig={'PageSize': 60}
+    )
+    return next((pool for page in pages for pool in page['UserPools']
+                 if 'carbonready' in pool['Name'].lower()), None)
+
+
+def check_dynamodb_tables(session: boto3.Session, executor: ThreadPoolExecutor,
+                          cache: Optional[ResultCache] = None) -> CheckResult:
     """Check DynamoDB tables exist and are active"""
-    print("\n" + "=" * 60)
-    print("Checking DynamoDB Tables")
-    print("=" * 60)
+    dynamodb = get_client(session, 'dynamodb')
     
     expected_tables = [
         'SensorDataTable',
@@ -57,118 +250,109 @@ def check_dynamodb_tables() -> Tuple[int, int]:
         'GrowthCurvesTable'
     ]
     
-    success = 0
-    failed = 0
-    
     try:
-        response = dynamodb.list_tables()
-        all_tables = response['TableNames']
+        pages = dynamodb.get_paginator('list_tables').paginate(
+            PaginationConfig={'PageSize': 100}
+        )
+        all_tables = [name for page in pages for name in page['TableNames']]
+    except AWS_ERRORS as e:
+        return CheckResult.failed(f"Error listing tables: {e}", count=len(expected_tables))
+    
+    # Match every expected name up front; only matched tables get described.
+    # Names that don't follow the CloudFormation pattern fall back to a scan.
+    by_logical_id = index_by_logical_id(all_tables)
+    matches = {
+        expected: by_logical_id.get(expected)
+                  or next((t for t in all_tables if expected in t), None)
+        for expected in expected_tables
+    }
+    
+    def probe(expected, table):
+        """Check the table matched for expected is active"""
+        if table is None:
+            return CheckResult.failed(f"{expected}: Not found")
         
-        for expected in expected_tables:
-            found = False
-            for table in all_tables:
-                if expected in table:
-                    # Check table status
-                    try:
-                        table_info = dynamodb.describe_table(TableName=table)
-                        status = table_info['Table']['TableStatus']
-                        
-                        if status == 'ACTIVE':
-                            print_status(f"{expected}: {table} ({status})", 'OK')
-                            success += 1
-                        else:
-                            print_status(f"{expected}: {table} ({status})", 'WARN')
-                            failed += 1
-                        
-                        found = True
-                        break
-                    except ClientError as e:
-                        print_status(f"{expected}: Error checking table - {e}", 'FAIL')
-                        failed += 1
-                        found = True
-                        break
-            
-            if not found:
-                print_status(f"{expected}: Not found", 'FAIL')
-                failed += 1
-    
-    except ClientError as e:
-        print_status(f"Error listing tables: {e}", 'FAIL')
-        return 0, len(expected_tables)
-    
-    return success, failed
-
-
-def check_s3_buckets() -> Tuple[int, int]:
-    """Check S3 buckets exist and are configured"""
-    print("\n" + "=" * 60)
-    print("Checking S3 Buckets")
-    print("=" * 60)
+        if cache and cache.get('table', table) == 'ACTIVE':
+            return CheckResult.passed(f"{expected}: {table} (ACTIVE, cached)")
+        
+        try:
+            status = table_status(dynamodb, table)
+        except AWS_ERRORS as e:
+            return CheckResult.failed(f"{expected}: Error checking table - {e}")
+        
+        if status == 'ACTIVE':
+            if cache:
+                cache.put('table', table, status)
+            return CheckResult.passed(f"{expected}: {table} ({status})")
+        return CheckResult.failed(f"{expected}: {table} ({status})", 'WARN')
     
-    success = 0
-    failed = 0
+    return sum(executor.map(probe, matches.keys(), matches.values()), CheckResult())
+
+
+def check_s3_buckets(session: boto3.Session, executor: ThreadPoolExecutor,
+                     sensor_bucket: str = None) -> CheckResult:
+    """
+    Check S3 buckets exist and are configured
+    
+    A known sensor_bucket name is checked with a single HEAD request;
+    otherwise the bucket is found by listing every bucket in the account.
+    """
+    s3 = get_client(session, 's3')
     
     try:
-        response = s3.list_buckets()
-        buckets = [b['Name'] for b in response['Buckets']]
-        
-        # Find sensor data bucket
-        sensor_bucket = None
-        for bucket in buckets:
-            if 'sensordatabucket' in bucket.lower():
-                sensor_bucket = bucket
-                break
-        
         if sensor_bucket:
-            print_status(f"Sensor data bucket: {sensor_bucket}", 'OK')
-            
-            # Check lifecycle policies
-            try:
-                lifecycle = s3.get_bucket_lifecycle_configuration(Bucket=sensor_bucket)
-                rules = lifecycle.get('Rules', [])
-                
-                if len(rules) >= 2:
-                    print_status(f"  Lifecycle policies: {len(rules)} rules configured", 'OK')
-                    success += 1
-                else:
-                    print_status(f"  Lifecycle policies: Only {len(rules)} rules found", 'WARN')
-                    failed += 1
-            except ClientError as e:
-                if e.response['Error']['Code'] == 'NoSuchLifecycleConfiguration':
-                    print_status("  Lifecycle policies: Not configured", 'FAIL')
-                    failed += 1
-                else:
-                    print_status(f"  Lifecycle policies: Error - {e}", 'FAIL')
-                    failed += 1
-            
-            # Check encryption
             try:
-                encryption = s3.get_bucket_encryption(Bucket=sensor_bucket)
-                print_status("  Encryption: Enabled", 'OK')
-                success += 1
-            except ClientError as e:
-                if e.response['Error']['Code'] == 'ServerSideEncryptionConfigurationNotFoundError':
-                    print_status("  Encryption: Not enabled", 'FAIL')
-                    failed += 1
-                else:
-                    print_status(f"  Encryption: Error - {e}", 'FAIL')
-                    failed += 1
+                s3.head_bucket(Bucket=sensor_bucket)
+            except AWS_ERRORS as e:
+                if error_code(e) not in ('404', 'NoSuchBucket'):
+                    raise
+                sensor_bucket = None
         else:
-            print_status("Sensor data bucket: Not found", 'FAIL')
-            failed += 2
-    
-    except ClientError as e:
-        print_status(f"Error listing buckets: {e}", 'FAIL')
-        return 0, 2
+            # Find sensor data bucket
+            response = s3.list_buckets()
+            sensor_bucket = next((b['Name'] for b in response['Buckets']
+                                  if 'sensordatabucket' in b['Name'].lower()), None)
+    except AWS_ERRORS as e:
+        return CheckResult.failed(f"Error finding sensor data bucket: {e}", count=2)
+    
+    if not sensor_bucket:
+        return CheckResult.failed("Sensor data bucket: Not found", count=2)
+    
+    def probe_lifecycle():
+        """Check lifecycle policies"""
+        try:
+            lifecycle = s3.get_bucket_lifecycle_configuration(Bucket=sensor_bucket)
+        except AWS_ERRORS as e:
+            if error_code(e) == 'NoSuchLifecycleConfiguration':
+                return CheckResult.failed("  Lifecycle policies: Not configured")
+            return CheckResult.failed(f"  Lifecycle policies: Error - {e}")
+        
+        rules = lifecycle.get('Rules', [])
+        if len(rules) >= 2:
+            return CheckResult.passed(f"  Lifecycle policies: {len(rules)} rules configured")
+        return CheckResult.failed(f"  Lifecycle policies: Only {len(rules)} rules found", 'WARN')
     
-    return success, failed
+    def probe_encryption():
+        """Check default encryption"""
+        try:
+            s3.get_bucket_encryption(Bucket=sensor_bucket)
+        except AWS_ERRORS as e:
+            if error_code(e) == 'ServerSideEncryptionConfigurationNotFoundError':
+                return CheckResult.failed("  Encryption: Not enabled")
+            return CheckResult.failed(f"  Encryption: Error - {e}")
+        return CheckResult.passed("  Encryption: Enabled")
+    
+    # The configuration reads are independent, so they go out together
+    futures = [executor.submit(probe) for probe in (probe_lifecycle, probe_encryption)]
+    return sum(
+        (future.result() for future in futures),
+        CheckResult.note(f"Sensor data bucket: {sensor_bucket}", 'OK')
+    )
 
 
-def check_lambda_functions() -> Tuple[int, int]:
+def check_lambda_functions(session: boto3.Session, executor: ThreadPoolExecutor) -> CheckResult:
     """Check Lambda functions are deployed"""
-    print("\n" + "=" * 60)
-    print("Checking Lambda Functions")
-    print("=" * 60)
+    lambda_client = get_client(session, 'lambda')
     
     expected_functions = [
         'carbonready-data-ingestion',
@@ -177,273 +361,239 @@ def check_lambda_functions() -> Tuple[int, int]:
         'carbonready-farm-metadata-api'
     ]
     
-    success = 0
-    failed = 0
-    
-    for function_name in expected_functions:
+    def probe(function_name):
+        """Check a Lambda function is deployed and active"""
         try:
             response = lambda_client.get_function(FunctionName=function_name)
-            state = response['Configuration']['State']
-            
-            if state == 'Active':
-                runtime = response['Configuration']['Runtime']
-                memory = response['Configuration']['MemorySize']
-                timeout = response['Configuration']['Timeout']
-                print_status(
-                    f"{function_name}: {state} ({runtime}, {memory}MB, {timeout}s timeout)",
-                    'OK'
-                )
-                success += 1
-            else:
-                print_status(f"{function_name}: {state}", 'WARN')
-                failed += 1
+        except AWS_ERRORS as e:
+            if error_code(e) == 'ResourceNotFoundException':
+                return CheckResult.failed(f"{function_name}: Not found")
+            return CheckResult.failed(f"{function_name}: Error - {e}")
         
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'ResourceNotFoundException':
-                print_status(f"{function_name}: Not found", 'FAIL')
-            else:
-                print_status(f"{function_name}: Error - {e}", 'FAIL')
-            failed += 1
+        state = response['Configuration']['State']
+        if state == 'Active':
+            runtime = response['Configuration']['Runtime']
+            memory = response['Configuration']['MemorySize']
+            timeout = response['Configuration']['Timeout']
+            return CheckResult.passed(
+                f"{function_name}: {state} ({runtime}, {memory}MB, {timeout}s timeout)"
+            )
+        return CheckResult.failed(f"{function_name}: {state}", 'WARN')
     
-    return success, failed
+    return sum(executor.map(probe, expected_functions), CheckResult())
 
 
-def check_api_gateway() -> Tuple[int, int]:
-    """Check API Gateway is deployed"""
-    print("\n" + "=" * 60)
-    print("Checking API Gateway")
-    print("=" * 60)
+def find_rest_api(session: boto3.Session, apigateway) -> Optional[Dict]:
+    """
+    Find the CarbonReady REST API
     
-    success = 0
-    failed = 0
+    The API stack publishes the API ID to SSM, so the API is fetched directly;
+    only a deployment without the parameter falls back to scanning every API.
+    """
+    ssm = get_client(session, 'ssm')
     
     try:
-        response = apigateway.get_rest_apis()
-        
-        api = None
-        for item in response['items']:
-            if 'CarbonReady' in item['name']:
-                api = item
-                break
-        
-        if api:
-            api_id = api['id']
-            api_name = api['name']
-            print_status(f"API: {api_name} ({api_id})", 'OK')
-            success += 1
-            
-            # Check stages
-            try:
-                stages = apigateway.get_stages(restApiId=api_id)
-                if stages['item']:
-                    stage_names = [s['stageName'] for s in stages['item']]
-                    print_status(f"  Stages: {', '.join(stage_names)}", 'OK')
-                    success += 1
-                else:
-                    print_status("  Stages: No stages deployed", 'FAIL')
-                    failed += 1
-            except ClientError as e:
-                print_status(f"  Stages: Error - {e}", 'FAIL')
-                failed += 1
-            
-            # Check authorizers
-            try:
-                authorizers = apigateway.get_authorizers(restApiId=api_id)
-                if authorizers['items']:
-                    print_status(f"  Authorizers: {len(authorizers['items'])} configured", 'OK')
-                    success += 1
-                else:
-                    print_status("  Authorizers: None configured", 'FAIL')
-                    failed += 1
-            except ClientError as e:
-                print_status(f"  Authorizers: Error - {e}", 'FAIL')
-                failed += 1
-        else:
-            print_status("API: Not found", 'FAIL')
-            failed += 3
+        api_id = ssm.get_parameter(Name=API_ID_PARAMETER)['Parameter']['Value']
+    except AWS_ERRORS as e:
+        if error_code(e) != 'ParameterNotFound':
+            raise
+    else:
+        try:
+            return apigateway.get_rest_api(restApiId=api_id)
+        except AWS_ERRORS as e:
+            if error_code(e) == 'NotFoundException':
+                return None
+            raise
+    
+    # Stop paging as soon as the API turns up
+    pages = apigateway.get_paginator('get_rest_apis').paginate(
+        PaginationConfig={'PageSize': 500}
+    )
+    return next((item for page in pages for item in page['items']
+                 if 'CarbonReady' in item['name']), None)
+
+
+def check_api_gateway(session: boto3.Session, executor: ThreadPoolExecutor) -> CheckResult:
+    """Check API Gateway is deployed"""
+    apigateway = get_client(session, 'apigateway')
+    
+    try:
+        api = find_rest_api(session, apigateway)
+    except AWS_ERRORS as e:
+        return CheckResult.failed(f"Error checking API Gateway: {e}", count=3)
     
-    except ClientError as e:
-        print_status(f"Error checking API Gateway: {e}", 'FAIL')
-        return 0, 3
+    if not api:
+        return CheckResult.failed("API: Not found", count=3)
     
-    return success, failed
+    api_id = api['id']
+    api_name = api['name']
+    
+    def probe_stages():
+        """Check stages"""
+        try:
+            stages = apigateway.get_stages(restApiId=api_id)
+        except AWS_ERRORS as e:
+            return CheckResult.failed(f"  Stages: Error - {e}")
+        if stages['item']:
+            stage_names = [s['stageName'] for s in stages['item']]
+            return CheckResult.passed(f"  Stages: {', '.join(stage_names)}")
+        return CheckResult.failed("  Stages: No stages deployed")
+    
+    def probe_authorizers():
+        """Check authorizers"""
+        try:
+            authorizers = apigateway.get_authorizers(restApiId=api_id)
+        except AWS_ERRORS as e:
+            return CheckResult.failed(f"  Authorizers: Error - {e}")
+        if authorizers['items']:
+            return CheckResult.passed(f"  Authorizers: {len(authorizers['items'])} configured")
+        return CheckResult.failed("  Authorizers: None configured")
+    
+    futures = [executor.submit(probe) for probe in (probe_stages, probe_authorizers)]
+    return sum(
+        (future.result() for future in futures),
+        CheckResult.passed(f"API: {api_name} ({api_id})")
+    )
 
 
-def check_iot_core() -> Tuple[int, int]:
+def check_iot_core(session: boto3.Session, executor: ThreadPoolExecutor) -> CheckResult:
     """Check IoT Core configuration"""
-    print("\n" + "=" * 60)
-    print("Checking AWS IoT Core")
-    print("=" * 60)
+    iot = get_client(session, 'iot')
     
-    success = 0
-    failed = 0
+    # Both names are fixed by the CDK stacks, so fetch them directly
+    policy_name = 'CarbonReadyESP32SensorPolicy'
+    rule_name = 'CarbonReadySensorDataRule'
     
-    # Check IoT endpoint
-    try:
-        endpoint = iot.describe_endpoint(endpointType='iot:Data-ATS')
-        print_status(f"IoT Endpoint: {endpoint['endpointAddress']}", 'OK')
-        success += 1
-    except ClientError as e:
-        print_status(f"IoT Endpoint: Error - {e}", 'FAIL')
-        failed += 1
-    
-    # Check IoT policy
-    try:
-        policies = iot.list_policies()
-        policy_found = False
-        for policy in policies['policies']:
-            if 'CarbonReadyESP32SensorPolicy' in policy['policyName']:
-                print_status(f"IoT Policy: {policy['policyName']}", 'OK')
-                policy_found = True
-                success += 1
-                break
-        
-        if not policy_found:
-            print_status("IoT Policy: CarbonReadyESP32SensorPolicy not found", 'FAIL')
-            failed += 1
-    except ClientError as e:
-        print_status(f"IoT Policy: Error - {e}", 'FAIL')
-        failed += 1
-    
-    # Check IoT rules
-    try:
-        rules = iot.list_topic_rules()
-        rule_found = False
-        for rule in rules['rules']:
-            if 'CarbonReadySensorDataRule' in rule['ruleName']:
-                print_status(f"IoT Rule: {rule['ruleName']}", 'OK')
-                rule_found = True
-                success += 1
-                break
-        
-        if not rule_found:
-            print_status("IoT Rule: CarbonReadySensorDataRule not found", 'FAIL')
-            failed += 1
-    except ClientError as e:
-        print_status(f"IoT Rule: Error - {e}", 'FAIL')
-        failed += 1
+    def probe_endpoint():
+        """Check the IoT data endpoint"""
+        try:
+            endpoint = iot.describe_endpoint(endpointType='iot:Data-ATS')
+        except AWS_ERRORS as e:
+            return CheckResult.failed(f"IoT Endpoint: Error - {e}")
+        return CheckResult.passed(f"IoT Endpoint: {endpoint['endpointAddress']}")
     
-    return success, failed
+    def probe_policy():
+        """Check the sensor policy exists"""
+        try:
+            iot.get_policy(policyName=policy_name)
+        except AWS_ERRORS as e:
+            if error_code(e) == 'ResourceNotFoundException':
+                return CheckResult.failed(f"IoT Policy: {policy_name} not found")
+            return CheckResult.failed(f"IoT Policy: Error - {e}")
+        return CheckResult.passed(f"IoT Policy: {policy_name}")
+    
+    def probe_rule():
+        """Check the sensor data rule exists"""
+        try:
+            iot.get_topic_rule(ruleName=rule_name)
+        except AWS_ERRORS as e:
+            # GetTopicRule reports a missing rule as UnauthorizedException
+            if error_code(e) in ('ResourceNotFoundException', 'UnauthorizedException'):
+                return CheckResult.failed(f"IoT Rule: {rule_name} not found")
+            return CheckResult.failed(f"IoT Rule: Error - {e}")
+        return CheckResult.passed(f"IoT Rule: {rule_name}")
+    
+    futures = [executor.submit(probe) for probe in (probe_endpoint, probe_policy, probe_rule)]
+    return sum((future.result() for future in futures), CheckResult())
 
 
-def check_sns_topics() -> Tuple[int, int]:
+def check_sns_topics(session: boto3.Session, executor: ThreadPoolExecutor) -> CheckResult:
     """Check SNS topics are configured"""
-    print("\n" + "=" * 60)
-    print("Checking SNS Topics")
-    print("=" * 60)
+    sns = get_client(session, 'sns')
     
     expected_topics = [
         'carbonready-critical-alerts',
         'carbonready-warnings'
     ]
     
-    success = 0
-    failed = 0
-    
     try:
-        response = sns.list_topics()
-        all_topics = [t['TopicArn'] for t in response['Topics']]
+        # Topic names are fixed, so key the ARNs by the name at their end and
+        # stop paging once every expected topic has turned up
+        topics = {}
+        for page in sns.get_paginator('list_topics').paginate():
+            for topic in page['Topics']:
+                topics[topic['TopicArn'].rsplit(':', 1)[-1]] = topic['TopicArn']
+            if all(expected in topics for expected in expected_topics):
+                break
+    except AWS_ERRORS as e:
+        return CheckResult.failed(f"Error listing SNS topics: {e}", count=len(expected_topics))
+    
+    def probe(expected):
+        """Check a topic exists; missing subscriptions only warn"""
+        topic_arn = topics.get(expected)
+        if topic_arn is None:
+            return CheckResult.failed(f"{expected}: Not found")
         
-        for expected in expected_topics:
-            found = False
-            for topic_arn in all_topics:
-                if expected in topic_arn:
-                    print_status(f"{expected}: {topic_arn}", 'OK')
-                    
-                    # Check subscriptions
-                    try:
-                        subs = sns.list_subscriptions_by_topic(TopicArn=topic_arn)
-                        sub_count = len(subs['Subscriptions'])
-                        if sub_count > 0:
-                            print_status(f"  Subscriptions: {sub_count} configured", 'OK')
-                        else:
-                            print_status("  Subscriptions: None configured", 'WARN')
-                    except ClientError as e:
-                        print_status(f"  Subscriptions: Error - {e}", 'WARN')
-                    
-                    success += 1
-                    found = True
-                    break
-            
-            if not found:
-                print_status(f"{expected}: Not found", 'FAIL')
-                failed += 1
-    
-    except ClientError as e:
-        print_status(f"Error listing SNS topics: {e}", 'FAIL')
-        return 0, len(expected_topics)
-    
-    return success, failed
-
-
-def check_cognito() -> Tuple[int, int]:
-    """Check Cognito user pool"""
-    print("\n" + "=" * 60)
-    print("Checking Cognito User Pool")
-    print("=" * 60)
+        result = CheckResult.passed(f"{expected}: {topic_arn}")
+        
+        # Check subscriptions
+        try:
+            subs = sns.list_subscriptions_by_topic(TopicArn=topic_arn)
+            sub_count = len(subs['Subscriptions'])
+            if sub_count > 0:
+                result += CheckResult.note(f"  Subscriptions: {sub_count} configured", 'OK')
+            else:
+                result += CheckResult.note("  Subscriptions: None configured", 'WARN')
+        except AWS_ERRORS as e:
+            result += CheckResult.note(f"  Subscriptions: Error - {e}", 'WARN')
+        
+        return result
     
-    success = 0
-    failed = 0
+    return sum(executor.map(probe, expected_topics), CheckResult())
+
+
+def check_cognito(session: boto3.Session, executor: ThreadPoolExecutor) -> CheckResult:
+    """Check Cognito user pool"""
+    cognito = get_client(session, 'cognito-idp')
     
     try:
-        response = cognito.list_user_pools(MaxResults=50)
-        
-        user_pool = None
-        for pool in response['UserPools']:
-            if 'carbonready' in pool['Name'].lower():
-                user_pool = pool
-                break
-        
-        if user_pool:
-            pool_id = user_pool['Id']
-            pool_name = user_pool['Name']
-            print_status(f"User Pool: {pool_name} ({pool_id})", 'OK')
-            success += 1
-            
-            # Check user pool clients
-            try:
-                clients = cognito.list_user_pool_clients(
-                    UserPoolId=pool_id,
-                    MaxResults=50
-                )
-                if clients['UserPoolClients']:
-                    print_status(f"  Clients: {len(clients['UserPoolClients'])} configured", 'OK')
-                    success += 1
-                else:
-                    print_status("  Clients: None configured", 'FAIL')
-                    failed += 1
-            except ClientError as e:
-                print_status(f"  Clients: Error - {e}", 'FAIL')
-                failed += 1
-            
-            # Check groups
-            try:
-                groups = cognito.list_groups(UserPoolId=pool_id)
-                if groups['Groups']:
-                    group_names = [g['GroupName'] for g in groups['Groups']]
-                    print_status(f"  Groups: {', '.join(group_names)}", 'OK')
-                    success += 1
-                else:
-                    print_status("  Groups: None configured", 'WARN')
-            except ClientError as e:
-                print_status(f"  Groups: Error - {e}", 'WARN')
-        else:
-            print_status("User Pool: Not found", 'FAIL')
-            failed += 3
+        user_pool = find_user_pool(cognito)
+    except AWS_ERRORS as e:
+        return CheckResult.failed(f"Error checking Cognito: {e}", count=3)
     
-    except ClientError as e:
-        print_status(f"Error checking Cognito: {e}", 'FAIL')
-        return 0, 3
+    if not user_pool:
+        return CheckResult.failed("User Pool: Not found", count=3)
     
-    return success, failed
+    pool_id = user_pool['Id']
+    pool_name = user_pool['Name']
+    
+    def probe_clients():
+        """Check user pool clients"""
+        try:
+            pages = cognito.get_paginator('list_user_pool_clients').paginate(
+                UserPoolId=pool_id,
+                PaginationConfig={'PageSize': 60}
+            )
+            client_count = sum(len(page['UserPoolClients']) for page in pages)
+        except AWS_ERRORS as e:
+            return CheckResult.failed(f"  Clients: Error - {e}")
+        if client_count:
+            return CheckResult.passed(f"  Clients: {client_count} configured")
+        return CheckResult.failed("  Clients: None configured")
+    
+    def probe_groups():
+        """Check groups; missing groups only warn"""
+        try:
+            pages = cognito.get_paginator('list_groups').paginate(
+                UserPoolId=pool_id,
+                PaginationConfig={'PageSize': 60}
+            )
+            group_names = [g['GroupName'] for page in pages for g in page['Groups']]
+        except AWS_ERRORS as e:
+            return CheckResult.note(f"  Groups: Error - {e}", 'WARN')
+        if group_names:
+            return CheckResult.passed(f"  Groups: {', '.join(group_names)}")
+        return CheckResult.note("  Groups: None configured", 'WARN')
+    
+    futures = [executor.submit(probe) for probe in (probe_clients, probe_groups)]
+    return sum(
+        (future.result() for future in futures),
+        CheckResult.passed(f"User Pool: {pool_name} ({pool_id})")
+    )
 
 
-def check_cloudwatch_logs() -> Tuple[int, int]:
+def check_cloudwatch_logs(session: boto3.Session, executor: ThreadPoolExecutor) -> CheckResult:
     """Check CloudWatch log groups"""
-    print("\n" + "=" * 60)
-    print("Checking CloudWatch Log Groups")
-    print("=" * 60)
-    
     expected_log_groups = [
         '/aws/lambda/carbonready-data-ingestion',
         '/aws/lambda/carbonready-ai-processing',
@@ -451,30 +601,65 @@ def check_cloudwatch_logs() -> Tuple[int, int]:
         '/aws/lambda/carbonready-farm-metadata-api'
     ]
     
-    success = 0
-    failed = 0
-    
-    logs_client = boto3.client('logs')
+    logs_client = get_client(session, 'logs')
     
+    # All the groups share one prefix, so a single listing covers them
+    try:
+        pages = logs_client.get_paginator('describe_log_groups').paginate(
+            logGroupNamePrefix='/aws/lambda/carbonready-',
+            PaginationConfig={'PageSize': 50}
+        )
+        found = {
+            group['logGroupName']: group.get('retentionInDays', 'Never expire')
+            for page in pages for group in page['logGroups']
+        }
+    except AWS_ERRORS as e:
+        return CheckResult.failed(f"Error listing log groups: {e}", count=len(expected_log_groups))
+    
+    result = CheckResult()
     for log_group in expected_log_groups:
-        try:
-            response = logs_client.describe_log_groups(
-                logGroupNamePrefix=log_group
-            )
-            
-            if response['logGroups']:
-                retention = response['logGroups'][0].get('retentionInDays', 'Never expire')
-                print_status(f"{log_group}: Exists (retention: {retention} days)", 'OK')
-                success += 1
-            else:
-                print_status(f"{log_group}: Not found", 'FAIL')
-                failed += 1
-        
-        except ClientError as e:
-            print_status(f"{log_group}: Error - {e}", 'FAIL')
-            failed += 1
+        if log_group in found:
+            result += CheckResult.passed(f"{log_group}: Exists (retention: {found[log_group]} days)")
+        else:
+            result += CheckResult.failed(f"{log_group}: Not found")
     
-    return success, failed
+    return result
+
+
+def print_check(title: str, result: CheckResult):
+    """Print one check's header and status lines"""
+    print("\n" + "=" * 60)
+    print(f"Checking {title}")
+    print("=" * 60)
+    print_status_lines(result.lines)
+
+
+async def run_checks(checks, session: boto3.Session, executor: ThreadPoolExecutor,
+                     on_result: Optional[Callable] = print_check) -> List[CheckResult]:
+    """
+    Run every check concurrently, reporting each as soon as it finishes
+    
+    on_result(title, result) is called in completion order, so a slow
+    check never holds back the output (or a failure) of a fast one. The
+    returned results are in the order of checks. Checks get a pool of
+    their own so their per-resource probes, which run on executor, never
+    wait behind other checks for a worker.
+    """
+    loop = asyncio.get_running_loop()
+    results = [None] * len(checks)
+    
+    with ThreadPoolExecutor(max_workers=len(checks)) as check_executor:
+        async def run(index, title, check):
+            return index, title, await loop.run_in_executor(check_executor, check, session, executor)
+        
+        runs = [run(index, title, check) for index, (title, check) in enumerate(checks)]
+        for finished in asyncio.as_completed(runs):
+            index, title, result = await finished
+            if on_result:
+                on_result(title, result)
+            results[index] = result
+    
+    return results
 
 
 def main():
@@ -491,31 +676,69 @@ def main():
         default='ap-south-1',
         help='AWS region (default: ap-south-1)'
     )
+    parser.add_argument(
+        '--sensor-bucket',
+        help='Sensor data bucket name; skips searching every bucket in the account'
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help=f'Reuse healthy table states cached by runs in the last {CACHE_TTL // 60} minutes'
+    )
+    parser.add_argument(
+        '--output',
+        choices=['text', 'json'],
+        default='text',
+        help='Output format; json prints a single summary object (default: text)'
+    )
     args = parser.parse_args()
+    text_output = args.output == 'text'
     
-    print("\n" + "=" * 60)
-    print(f"CarbonReady Deployment Verification - {args.env.upper()}")
-    print("=" * 60)
+    # Every client is created lazily from this one session
+    session = create_session(args.region)
+    
+    cache = ResultCache(
+        CACHE_DIR / f"verify-{args.env}-{args.region}.json",
+        load=args.cache
+    )
     
-    total_success = 0
-    total_failed = 0
+    if text_output:
+        print("\n" + "=" * 60)
+        print(f"CarbonReady Deployment Verification - {args.env.upper()}")
+        print("=" * 60)
     
     # Run all checks
     checks = [
-        check_dynamodb_tables,
-        check_s3_buckets,
-        check_lambda_functions,
-        check_api_gateway,
-        check_iot_core,
-        check_sns_topics,
-        check_cognito,
-        check_cloudwatch_logs
+        ("DynamoDB Tables", functools.partial(check_dynamodb_tables, cache=cache)),
+        ("S3 Buckets", functools.partial(check_s3_buckets, sensor_bucket=args.sensor_bucket)),
+        ("Lambda Functions", check_lambda_functions),
+        ("API Gateway", check_api_gateway),
+        ("AWS IoT Core", check_iot_core),
+        ("SNS Topics", check_sns_topics),
+        ("Cognito User Pool", check_cognito),
+        ("CloudWatch Log Groups", check_cloudwatch_logs)
     ]
     
-    for check in checks:
-        success, failed = check()
-        total_success += success
-        total_failed += failed
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = asyncio.run(run_checks(
+            checks, session, executor, on_result=print_check if text_output else None
+        ))
+    cache.save()
+    
+    total = sum(results, CheckResult())
+    total_success = total.ok
+    total_failed = total.fail
+    
+    if not text_output:
+        json.dump({
+            'env': args.env,
+            'region': args.region,
+            'checks': [result.as_dict(title) for (title, _), result in zip(checks, results)],
+            'total_ok': total_success,
+            'total_fail': total_failed
+        }, sys.stdout, indent=2)
+        print()
+        sys.exit(0 if total_failed == 0 else 1)
     
     # Summary
     print("\n" + "=" * 60)